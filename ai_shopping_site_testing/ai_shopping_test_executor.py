@@ -6,13 +6,47 @@
 # Expected Cost Savings: 85%+ on API calls
 
 import os
+import re
 import sys
+import atexit
 import time
 import json
+import base64
 import hashlib
-import requests
-from typing import List, Dict, Optional, Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import IntEnum
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from types import MappingProxyType
+from typing import List, Dict, Optional, Any, Tuple, Callable, Mapping
+from html import unescape
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
+from bs4.element import NavigableString, PreformattedString, Script, Stylesheet, TemplateString
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401 - only probed so BeautifulSoup can use the C parser
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    _BS4_PARSER = 'html.parser'
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.webdriver import WebDriver
@@ -27,7 +61,9 @@ from selenium.common.exceptions import (
     InvalidSessionIdException,
     SessionNotCreatedException,
     ElementNotInteractableException,
-    StaleElementReferenceException, ElementClickInterceptedException
+    StaleElementReferenceException, ElementClickInterceptedException,
+    InvalidSelectorException,
+    NoAlertPresentException
 )
 
 
@@ -35,11 +71,19 @@ from selenium.common.exceptions import (
 # ============================================================
 # SHOPPING SITES CONFIGURATION
 # ============================================================
-SHOPPING_SITES = {
-    "automation_exercise": {
-        "url": "https://automationexercise.com/",
-        "requires_auth": True,
-        "test_groups": [
+@dataclass(frozen=True)
+class SiteConfig:
+    """Read-only settings for one shopping site"""
+    url: str
+    requires_auth: bool
+    test_groups: Tuple[Dict[str, Any], ...]
+
+
+SHOPPING_SITES: Mapping[str, SiteConfig] = MappingProxyType({
+    "automation_exercise": SiteConfig(
+        url="https://automationexercise.com/",
+        requires_auth=True,
+        test_groups=(
             {"name": "auth", "test_ids": [1, 2, 3, 4, 5], "description": "Authentication tests"},
             {"name": "products", "test_ids": [8, 9, 18, 19, 21, 27], "description": "Product browsing tests"},
             {"name": "cart", "test_ids": [12, 13, 17, 20, 22], "description": "Shopping cart tests"},
@@ -47,9 +91,9 @@ SHOPPING_SITES = {
             {"name": "engagement", "test_ids": [6, 10, 11], "description": "Newsletter & contact tests"},
             {"name": "navigation", "test_ids": [7, 25, 26], "description": "Navigation tests"},
             {"name": "exploration", "test_ids": [100], "description": "AI exploratory testing"}
-        ]
-    }
-}
+        )
+    )
+})
 
 TEST_GROUPS = [
             {"name": "auth", "test_ids": [1, 2, 3, 4, 5], "description": "Authentication tests"},
@@ -64,7 +108,6 @@ TEST_GROUPS = [
 
 
 # Generic test cases file
-import os
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 GENERIC_TEST_CASES_FILE = os.path.join(SCRIPT_DIR, "generic_form_page_crawler_test_cases.json")
 DOM_CACHE_FILE = os.path.join(SCRIPT_DIR, "dom_cache.json")
@@ -89,11 +132,30 @@ logging.basicConfig(
 logger = logging.getLogger('init_logger.shopping_test_site')
 result_logger_gui = logging.getLogger('init_result_logger_gui.shopping_test_site')
 
+# Log separators, built once
+_SEP = "-" * 70
+_BIGSEP = "=" * 70
+
+
+def _banner(title: str, lines: Tuple[str, ...] = ()) -> None:
+    """Print a separator-framed section to stdout in a single write"""
+    sys.stdout.write("\n".join(("", _BIGSEP, title, *lines, _BIGSEP, "")))
+    sys.stdout.flush()
+
+
+def _log_banner(title: str, log: logging.Logger = logger) -> None:
+    """Log a separator-framed title as one record"""
+    log.info("%s\n%s\n%s", _BIGSEP, title, _BIGSEP)
+
 
 
 # ============================================================
 # OPTIMIZATION 2: DOM CACHE BY URL
 # ============================================================
+# Matches the query string / fragment tail of a URL
+_STRIP_QF = re.compile(r'[?#].*$', re.DOTALL)
+
+
 class DOMCache:
     """
     Cache DOM by URL to avoid redundant AI calls - SAVES API COSTS
@@ -114,26 +176,37 @@ class DOMCache:
     This is why we MUST pass current_dom_hash to get() method!
     """
     
-    def __init__(self, cache_file: str = DOM_CACHE_FILE):
+    def __init__(self, cache_file: str = DOM_CACHE_FILE, flush_interval: float = 10.0):
         self.cache = {}  # {url: {dom_html, dom_hash, timestamp}}
         self.cache_file = cache_file
+        # Saves are debounced: set() writes only if flush_interval has passed since
+        # the last save; entries set in between wait for a later set() or flush()
+        self.flush_interval = flush_interval
+        self._last_save = 0.0
+        self._dirty = False
+        # On disk, dom_html is stored zstd-compressed + base64 as 'dom_zst' (when
+        # zstandard is installed); {key: dom_zst} so unchanged entries aren't recompressed
+        self._packed: Dict[str, str] = {}
         self.load_cache()
     
     def get_cache_key(self, url: str) -> str:
         """Generate cache key from URL (remove query params)"""
-        from urllib.parse import urlparse, urlunparse
-        parsed = urlparse(url)
-        # Remove query params and fragments for cache key
-        normalized = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
-        return normalized
+        # Remove query params and fragments, then normalize trailing slash
+        # so /path and /path/ share one entry (scheme://host/ keeps its slash;
+        # URLs without a host such as about:blank are left as they are)
+        normalized = _STRIP_QF.sub('', url)
+        if '://' not in normalized:
+            return normalized
+        normalized = normalized.rstrip('/')
+        return normalized if normalized.count('/') > 2 else normalized + '/'
     
-    def get(self, url: str, current_dom_hash: str) -> Optional[Dict[str, Any]]:
+    def get(self, url: str, current_dom_hash: bytes) -> Optional[Dict[str, Any]]:
         """
         Get cached DOM data for URL with hash validation
         
         Args:
             url: Current page URL
-            current_dom_hash: Hash of current actual DOM (for validation)
+            current_dom_hash: Digest of current actual DOM (for validation)
         
         Returns:
             Cached data if URL matches AND hash matches, None otherwise
@@ -143,6 +216,7 @@ class DOMCache:
         if key in self.cache:
             cached_data = self.cache[key]
             cached_hash = cached_data.get('dom_hash')
+            current_dom_hash = current_dom_hash.hex()  # Stored as hex in the JSON file
             
             # ✅ CRITICAL: Verify hash matches (DOM didn't change on same URL)
             if cached_hash == current_dom_hash:
@@ -158,24 +232,37 @@ class DOMCache:
         print(f"[DOMCache] ❌ Cache MISS for {key}")
         return None
     
-    def set(self, url: str, dom_html: str, dom_hash: str):
+    def set(self, url: str, dom_html: str, dom_hash: bytes):
         """Save DOM to cache"""
         key = self.get_cache_key(url)
         self.cache[key] = {
             'dom_html': dom_html,
-            'dom_hash': dom_hash,
+            'dom_hash': dom_hash.hex(),
             'timestamp': time.time()
         }
+        self._packed.pop(key, None)
         print(f"[DOMCache] 💾 Cached DOM for {key} ({len(dom_html)} chars)")
         logger.info(f"[DOMCache] Cached DOM for {url}")
-        self.save_cache()
+        self._dirty = True
+        if time.time() - self._last_save >= self.flush_interval:
+            self.save_cache()
+
+    def flush(self):
+        """Write pending entries to disk"""
+        if self._dirty:
+            self.save_cache()
     
     def load_cache(self):
         """Load cache from file"""
         try:
             if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    self.cache = json.load(f)
+                if orjson:
+                    with open(self.cache_file, 'rb') as f:
+                        self.cache = orjson.loads(f.read())
+                else:
+                    with open(self.cache_file, 'r') as f:
+                        self.cache = json.load(f)
+                self._unpack_entries()
                 print(f"[DOMCache] Loaded {len(self.cache)} cached DOMs")
                 logger.info(f"[DOMCache] Loaded {len(self.cache)} cached entries")
         except Exception as e:
@@ -183,12 +270,61 @@ class DOMCache:
             self.cache = {}
     
     def save_cache(self):
-        """Save cache to file"""
+        """Save cache to file (compact - the cache is never hand-edited)"""
+        tmp_file = self.cache_file + '.tmp'
         try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f, indent=2)
+            # Write to a temp file and swap it in, so a crash mid-write never
+            # leaves a truncated cache behind (load_cache would discard it)
+            data = self._packed_entries()
+            if orjson:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, self.cache_file)
+            self._last_save = time.time()
+            self._dirty = False
         except Exception as e:
             print(f"[DOMCache] Error saving cache: {e}")
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+    
+    def _packed_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Cache as written to disk - dom_html compressed into dom_zst when possible"""
+        if not zstandard:
+            return self.cache
+        
+        compressor = zstandard.ZstdCompressor(level=3)
+        data = {}
+        for key, entry in self.cache.items():
+            packed = self._packed.get(key)
+            if packed is None:
+                packed = base64.b64encode(compressor.compress(entry['dom_html'].encode('utf-8'))).decode('ascii')
+                self._packed[key] = packed
+            data[key] = {'dom_zst': packed, 'dom_hash': entry['dom_hash'], 'timestamp': entry['timestamp']}
+        return data
+    
+    def _unpack_entries(self):
+        """Inflate dom_zst entries read from disk back to dom_html"""
+        decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        for key in list(self.cache):
+            entry = self.cache[key]
+            packed = entry.pop('dom_zst', None)
+            if packed is None:
+                continue
+            if decompressor is None:
+                # Written by a run with zstandard installed - can't read it here
+                del self.cache[key]
+                continue
+            entry['dom_html'] = decompressor.decompress(base64.b64decode(packed)).decode('utf-8')
+            self._packed[key] = packed
     
     def clear_old_entries(self, max_age_hours: int = 24):
         """Remove cache entries older than max_age_hours"""
@@ -202,6 +338,7 @@ class DOMCache:
         
         for key in old_keys:
             del self.cache[key]
+            self._packed.pop(key, None)
         
         if old_keys:
             print(f"[DOMCache] Cleared {len(old_keys)} old entries")
@@ -334,46 +471,30 @@ class TestContext:
 # ============================================================
 # AI HELPER
 # ============================================================
-import anthropic
-
-
 class AIHelper:
     """Helper class for AI-powered step generation using Claude API"""
     
     def __init__(self, api_key: str):
         if not api_key:
             raise ValueError("API key is required for AI functionality")
+        # Imported here so replay runs never pay for the Anthropic SDK import
+        import anthropic
         self.client = anthropic.Anthropic(api_key=api_key)
         self.model = "claude-sonnet-4-5-20250929"
 
-    def generate_test_steps(
+    def prepare_group_prefix(
             self,
-            dom_html: str,
             test_cases: List[Dict[str, str]],
-            previous_steps: Optional[List[Dict]] = None,
-            step_where_dom_changed: Optional[int] = None,
             test_context=None,
             is_first_group: bool = False
-    ) -> List[Dict[str, Any]]:
-        """
-        Generate Selenium test steps based on DOM and test cases.
-        If DOM changed, provide previous steps and which step caused the change.
+    ) -> str:
         """
+        Build the part of the step-generation prompt that stays the same for a
+        whole test group: instructions, credentials and the test cases.
         
-        # Build the prompt
-        if previous_steps and step_where_dom_changed is not None:
-            context = f"""
-DOM CHANGED after executing step {step_where_dom_changed}.
-
-Previous steps that were executed:
-{json.dumps(previous_steps[:step_where_dom_changed + 1], indent=2)}
-
-Please generate the REMAINING steps (starting from step {step_where_dom_changed + 1}) 
-based on this NEW DOM state.
-"""
-        else:
-            context = "This is the initial DOM. Please generate ALL test steps."
-
+        Pass the result to generate_test_steps() as cached_prefix - it is sent as
+        a cached prompt block, so each call only adds the DOM and step context.
+        """
         import random
 
         if is_first_group and test_context:
@@ -409,7 +530,7 @@ based on this NEW DOM state.
             else:
                 credentials_instruction = "=== NO CREDENTIALS AVAILABLE ===\nSkip any login/registration tests.\n"
 
-        prompt = f"""You are a test automation expert generating Selenium WebDriver test steps for a shopping website.
+        return f"""You are a test automation expert generating Selenium WebDriver test steps for a shopping website.
 
         === 🚫 CRITICAL: FORBIDDEN SELECTORS (READ THIS FIRST!) 🚫 ===
 
@@ -556,11 +677,6 @@ based on this NEW DOM state.
         6. wait_for_ajax: {{"action": "wait_for_ajax", "selector": ".loading-spinner", "wait_seconds": 10}}
 
 
-        === CURRENT PAGE DOM ===
-
-        {dom_html}
-
-
         === TEST CASES TO IMPLEMENT ===
 
         {json.dumps(test_cases, indent=2)}
@@ -682,6 +798,44 @@ based on this NEW DOM state.
         ☐ Each generic step expanded into specific actions
         ☐ Using test context credentials correctly
         ☐ Valid JSON format (no trailing commas, proper quotes)
+        """
+
+    def generate_test_steps(
+            self,
+            dom_html: str,
+            test_cases: List[Dict[str, str]],
+            previous_steps: Optional[List[Dict]] = None,
+            step_where_dom_changed: Optional[int] = None,
+            test_context=None,
+            is_first_group: bool = False,
+            cached_prefix: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate Selenium test steps based on DOM and test cases.
+        If DOM changed, provide previous steps and which step caused the change.
+        Pass cached_prefix from prepare_group_prefix() to reuse the group's prompt prefix.
+        """
+        if cached_prefix is None:
+            cached_prefix = self.prepare_group_prefix(test_cases, test_context, is_first_group)
+        
+        # Build the prompt
+        if previous_steps and step_where_dom_changed is not None:
+            context = f"""
+DOM CHANGED after executing step {step_where_dom_changed}.
+
+Previous steps that were executed:
+{json.dumps(previous_steps[:step_where_dom_changed + 1], indent=2)}
+
+Please generate the REMAINING steps (starting from step {step_where_dom_changed + 1}) 
+based on this NEW DOM state.
+"""
+        else:
+            context = "This is the initial DOM. Please generate ALL test steps."
+
+        prompt = f"""=== CURRENT PAGE DOM ===
+
+        {dom_html}
+
 
         {context}
 
@@ -696,7 +850,11 @@ based on this NEW DOM state.
                 model=self.model,
                 max_tokens=16000,
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": [
+                        # Group prefix is identical across the group's calls - let the API cache it
+                        {"type": "text", "text": cached_prefix, "cache_control": {"type": "ephemeral"}},
+                        {"type": "text", "text": prompt}
+                    ]}
                 ]
             )
             
@@ -839,40 +997,51 @@ class TestCaseRepository:
     """Load generic test cases from JSON file"""
 
     def __init__(self, cache_file: str = GENERIC_TEST_CASES_FILE):
-        self.test_cases_file = cache_file  # Now points to generic_form_page_crawler_test_cases.json
-        # Get directory where the script is located
+        # Relative names resolve next to the script, never against the CWD
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.cache_path = os.path.join(script_dir, cache_file)
+        self.test_cases_file = self.cache_path  # Alias - same file as cache_path
+        # Parsed files: {path: (mtime_ns, test_cases)}
+        self._parsed = {}
     
-
+    def _load(self, path: str) -> List[Dict[str, Any]]:
+        """Parse a test cases file, reusing the last result while its mtime is unchanged"""
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._parsed.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        if orjson:
+            with open(path, 'rb') as f:
+                test_cases = orjson.loads(f.read())
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                test_cases = json.load(f)
+        self._parsed[path] = (mtime, test_cases)
+        return test_cases
     
     def load_cached_test_cases(self) -> List[Dict[str, Any]]:
         """Load test cases from cache file"""
         try:
-            with open(self.cache_path, 'r', encoding='utf-8') as f:
-                test_cases = json.load(f)
-                logger.info(f"[TestCaseRepository] Loaded {len(test_cases)} test cases from cache")
-                print(f"[TestCaseRepository] Loaded {len(test_cases)} test cases from cache")
-                return test_cases
+            test_cases = self._load(self.cache_path)
+            logger.info(f"[TestCaseRepository] Loaded {len(test_cases)} test cases from cache")
+            print(f"[TestCaseRepository] Loaded {len(test_cases)} test cases from cache")
+            return test_cases
         except Exception as e:
             result_logger_gui.error(f"[TestCaseRepository] Error loading cache: {e}")
             print(f"[TestCaseRepository] Error loading cache: {e}")
             return []
     
-
-
-
     def get_test_cases(self) -> List[Dict]:
         """Load generic test cases from JSON file"""
 
-        if not os.path.exists(self.test_cases_file):
-            print(f"[TestCaseRepository] ❌ File not found: {self.test_cases_file}")
-            result_logger_gui.error(f"Test cases file not found: {self.test_cases_file}")
+        if not os.path.exists(self.cache_path):
+            print(f"[TestCaseRepository] ❌ File not found: {self.cache_path}")
+            result_logger_gui.error(f"Test cases file not found: {self.cache_path}")
             return []
 
         try:
-            with open(self.test_cases_file, 'r', encoding='utf-8') as f:
-                test_cases = json.load(f)
+            test_cases = self._load(self.cache_path)
 
             print(f"[TestCaseRepository] Loaded {len(test_cases)} generic test cases")
             logger.info(f"[TestCaseRepository] Loaded {len(test_cases)} test cases")
@@ -888,126 +1057,359 @@ class TestCaseRepository:
 # ============================================================
 # OPTIMIZATION 1: MINIMAL DOM EXTRACTOR
 # ============================================================
+# Interactive selectors (always included)
+INTERACTIVE_SELECTORS = (
+    'a',           # Links
+    'button',      # Buttons
+    'input',       # Input fields
+    'select',      # Dropdowns
+    'textarea',    # Text areas
+    'form',        # Forms
+    '[onclick]',   # Clickable elements
+    '[data-qa]',   # Test attributes
+    '[id]',        # Elements with IDs
+    '[class*="btn"]',      # Button-like classes
+    '[class*="link"]',     # Link classes
+)
+
+# Verification selectors (only if needed)
+VERIFICATION_SELECTORS = (
+    '[class*="alert"]',      # Alert messages
+    '[class*="message"]',    # Messages
+    '[class*="error"]',      # Errors
+    '[class*="success"]',    # Success messages
+    '[class*="cart"]',       # Cart elements
+    '[class*="total"]',      # Totals
+    '[class*="price"]',      # Prices
+    '[class*="product"]',    # Product elements
+    '[class*="checkout"]',   # Checkout elements
+    'img[alt]',              # Images with alt text
+    'h1', 'h2', 'h3',        # Headers (for context)
+    '.price',                # Prices
+    '.total',                # Totals
+)
+
+# Selector groups are input-independent - build them once
+_COMBINED_ACTIONS = ", ".join(INTERACTIVE_SELECTORS)
+_COMBINED_FULL = _COMBINED_ACTIONS + ", " + ", ".join(VERIFICATION_SELECTORS)
+
+# Attributes worth sending to the AI - everything else is dropped
+_KEPT_ATTRS = ('id', 'class', 'name', 'href', 'type', 'data-qa')
+
+# Max elements sent to the AI per minimal DOM
+MINIMAL_DOM_LIMIT_FULL = 300
+MINIMAL_DOM_LIMIT_ACTIONS = 150
+
+# Runs the selector group against the live DOM and returns [tag, attrs, text]
+# for each match, so Python never has to parse the page. arguments[3] limits
+# the query to <body> (actions-only level). Text is cut at 200 code points, as
+# Python slices it. _minimal_from_html must produce the same triples.
+_MINIMAL_DOM_JS = """
+var keep = arguments[2];
+var root = arguments[3] && document.body || document;
+return Array.prototype.slice.call(root.querySelectorAll(arguments[0]), 0, arguments[1]).map(function (e) {
+    var attrs = {};
+    keep.forEach(function (k) { if (e.hasAttribute(k)) attrs[k] = e.getAttribute(k); });
+    var text = e.textContent.replace(/\\s+/g, ' ').trim();
+    return [e.tagName.toLowerCase(), attrs, Array.from(text.slice(0, 400)).slice(0, 200).join('')];
+});
+"""
+
+# JavaScript's \s - Python's own whitespace set differs (e.g. \x1c, \ufeff)
+_JS_SPACE_RE = re.compile(r'[\t\n\v\f\r \xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff]+')
+
+# Elements whose content Lexbor keeps as raw text - the page source (XMLSerializer)
+# escapes it, while the browser's textContent has it unescaped
+_RAW_TEXT_TAGS = frozenset({'script', 'style', 'xmp', 'iframe', 'noembed', 'noframes'})
+
+# Page source (serialized as chromedriver's page_source does) + minimal DOM elements
+# in one round trip; takes the same arguments as _MINIMAL_DOM_JS
+_SNAPSHOT_MINIMAL_JS = (
+    "var elements = (function () {" + _MINIMAL_DOM_JS + "}).apply(null, arguments);\n"
+    "return [new XMLSerializer().serializeToString(document), elements];"
+)
+
+# HTML escaping as single-pass str.translate tables
+_ATTR_ESCAPE = str.maketrans({'&': '&amp;', '"': '&quot;', '<': '&lt;', '>': '&gt;'})
+_TEXT_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Counts DOM mutations in-page so unchanged pages never ship page_source to Python
+_MUTATION_COUNTER_JS = """
+if (window.__domMut === undefined) {
+    window.__domMut = 0;
+    new MutationObserver(function (mutations) { window.__domMut += mutations.length; })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    return null;
+}
+return window.__domMut;
+"""
+
+# Mutation count (as above) and the page URL in one round trip
+_PAGE_STATE_JS = (
+    "var count = (function () {" + _MUTATION_COUNTER_JS + "})();\n"
+    "return [count, window.location.href];"
+)
+
+# Same observer, but installed eagerly: returns the live count (0 when just installed)
+_ARM_MUTATION_COUNTER_JS = _MUTATION_COUNTER_JS.replace("return null;", "return 0;")
+
+
+def _unique_nodes(nodes, key=id):
+    """
+    Yield each parsed node once, in query order
+    
+    bs4 tags are told apart by identity; Lexbor returns a new wrapper per match,
+    so its nodes are compared by value (same underlying node).
+    """
+    seen = set()
+    for node in nodes:
+        node_key = key(node) if key else node
+        if node_key in seen:
+            continue
+        seen.add(node_key)
+        yield node
+
+
+def _capped_text(strings, limit: int = 200) -> str:
+    """
+    Whitespace-collapsed, trimmed textContent cut to limit, as _MINIMAL_DOM_JS builds it,
+    reading only as many text nodes as the first limit characters need
+    """
+    parts = []
+    visible = 0
+    for text in strings:
+        parts.append(text)
+        # The collapsed text is at least as long as its non-space characters
+        visible += len(text) - sum(len(run) for run in _JS_SPACE_RE.findall(text))
+        if visible > limit:
+            break
+    return _JS_SPACE_RE.sub(' ', ''.join(parts)).strip(' ')[:limit]
+
+
+def _bs4_strings(elem):
+    """An element's text nodes as textContent sees them (no comments, no <template> content)"""
+    for node in elem.descendants:
+        if not isinstance(node, NavigableString) or isinstance(node, (PreformattedString, TemplateString)):
+            continue
+        yield unescape(node) if isinstance(node, (Script, Stylesheet)) else node
+
+
+def _lexbor_strings(elem):
+    """Lexbor counterpart of _bs4_strings"""
+    for node in elem.traverse(include_text=True):
+        if node.tag == '-text':
+            text = node.text_content
+            yield unescape(text) if node.parent.tag in _RAW_TEXT_TAGS else text
+
+
+def _format_minimal(elements) -> str:
+    """Render (tag, attrs, text) triples as the minimal HTML sent to the AI"""
+    parts = ["<body>\n"]
+    
+    for tag, node_attrs, text in elements:
+        # Skip empty non-input elements
+        if not text and tag not in ['input', 'button', 'select', 'img']:
+            continue
+    
+        # Keep only essential attributes - one dict lookup each
+        # (Lexbor returns valueless attributes as None)
+        attr_parts = []
+        for key in _KEPT_ATTRS:
+            if key in node_attrs:
+                attr_parts.append(f'{key}="{(node_attrs[key] or "").translate(_ATTR_ESCAPE)}"')
+        attr_str = ' '.join(attr_parts)
+        parts.append(f"<{tag} {attr_str}>{text.translate(_TEXT_ESCAPE)}</{tag}>\n")
+    
+    parts.append("</body>")
+    return "".join(parts)
+
+
+def _minimal_query(include_verification: bool) -> Tuple[str, int]:
+    """Combined selector and element limit for a minimal DOM level"""
+    if include_verification:
+        return _COMBINED_FULL, MINIMAL_DOM_LIMIT_FULL
+    return _COMBINED_ACTIONS, MINIMAL_DOM_LIMIT_ACTIONS
+
+
+def _minimal_from_html(full_html: str, include_verification: bool) -> str:
+    """
+    Pure page-source -> minimal-HTML transform behind DOMExtractor.get_minimal_dom
+    
+    Touches no driver or instance state, so it can run on worker threads.
+    Produces the same output as _format_minimal() over _MINIMAL_DOM_JS's result
+    for the page the source was serialized from - both land under one digest.
+    """
+    body_only = not include_verification
+    if body_only:
+        # Action elements all live in <body> - don't parse <head> scripts/styles/meta
+        body_start = full_html.find('<body')
+        if body_start > 0:
+            full_html = full_html[body_start:]
+    
+    # Selector groups are precompiled at module scope
+    combined_selector, limit = _minimal_query(include_verification)
+    
+    # Lexbor (C parser) when available, BeautifulSoup otherwise.
+    # Extract matching elements - one selector group = one walk over the DOM
+    if LexborHTMLParser:
+        tree = LexborHTMLParser(full_html)
+        root = tree.body if body_only and tree.body else tree
+        relevant_elements = root.css(combined_selector)
+        if root is tree.body and relevant_elements and relevant_elements[0] == root:
+            # Node.css() includes the node itself, querySelectorAll() does not
+            relevant_elements = relevant_elements[1:]
+        unique_elements = _unique_nodes(relevant_elements, key=None)
+    else:
+        # Attribute values as written (class is not split into a list)
+        soup = BeautifulSoup(full_html, _BS4_PARSER, multi_valued_attributes=None)
+        root = soup.body if body_only and soup.body else soup
+        relevant_elements = root.select(combined_selector)
+        if '<template' in full_html:
+            # <template> content is not part of the browser's DOM tree
+            relevant_elements = [e for e in relevant_elements if e.find_parent('template') is None]
+        unique_elements = _unique_nodes(relevant_elements)
+    
+    def parsed_elements():
+        # Dedup lazily and stop as soon as the limit is hit
+        for elem in islice(unique_elements, limit):
+            if LexborHTMLParser:
+                yield elem.tag, elem.attributes, _capped_text(_lexbor_strings(elem))
+            else:
+                yield elem.name, elem.attrs, _capped_text(_bs4_strings(elem))
+    
+    return _format_minimal(parsed_elements())
+
+
 class DOMExtractor:
     """Extract and track DOM state - WITH MINIMAL DOM OPTIMIZATION"""
     
+    MINIMAL_CACHE_SIZE = 64
+    
     def __init__(self, driver: WebDriver):
         self.driver = driver
+        # {(dom digest, include_verification): minimal_html}, oldest first
+        self._minimal_cache: "OrderedDict[Tuple[bytes, bool], str]" = OrderedDict()
+        # Last hashed page source and its digest, shared by hash + extract
+        self._last_html = None
+        self._last_digest = None
     
     def get_dom_html(self) -> str:
         """Get full page source HTML"""
         return self.driver.page_source
     
-    def get_dom_hash(self) -> str:
-        """Get hash of current DOM for change detection"""
-        dom_html = self.get_dom_html()
-        return hashlib.md5(dom_html.encode('utf-8')).hexdigest()
+    def _digest(self, dom_html: str) -> bytes:
+        """Hash page source, reusing the last digest if the source is unchanged"""
+        if dom_html != self._last_html:
+            self._last_html = dom_html
+            # Always BLAKE2b (stdlib, C): the hex form is also the persistent DOMCache
+            # key, so every environment must produce the same digest for a page
+            self._last_digest = hashlib.blake2b(dom_html.encode('utf-8'), digest_size=16).digest()
+        return self._last_digest
+    
+    def get_dom_snapshot(self, prefetch_minimal: Optional[bool] = None) -> Tuple[str, bytes]:
+        """
+        Fetch page source once and return (dom_html, dom_digest)
+        
+        The raw digest is enough for equality checks - no hex string is built.
+        Pass dom_html on to get_minimal_dom() to avoid a second page_source round-trip.
+        
+        Args:
+            prefetch_minimal: If set, the minimal DOM for this include_verification level
+                              is extracted in the same script call and cached, so the
+                              following get_minimal_dom() needs no browser round trip
+        """
+        if prefetch_minimal is None:
+            dom_html = self.get_dom_html()
+            return dom_html, self._digest(dom_html)
+        
+        selector, limit = _minimal_query(prefetch_minimal)
+        try:
+            dom_html, elements = self.driver.execute_script(
+                _SNAPSHOT_MINIMAL_JS, selector, limit, list(_KEPT_ATTRS), not prefetch_minimal)
+        except WebDriverException:
+            dom_html = self.get_dom_html()
+            return dom_html, self._digest(dom_html)
+        
+        digest = self._digest(dom_html)
+        self._remember_minimal((digest, prefetch_minimal), _format_minimal(elements))
+        return dom_html, digest
+    
+    def get_page_state(self) -> Tuple[Optional[int], str]:
+        """
+        (mutation count, current URL) from a single script call
+        
+        The count comes from an in-page MutationObserver. It is None when no
+        observer is attached to the current document (first call, or after a
+        navigation); one is installed so the next call has a count.
+        """
+        try:
+            mutation_count, url = self.driver.execute_script(_PAGE_STATE_JS)
+            return mutation_count, url
+        except WebDriverException:
+            return None, self.driver.current_url
+    
+    def arm_mutation_counter(self) -> Optional[int]:
+        """
+        Install the MutationObserver right after a navigation and return its count
+        
+        Gives DOMChangeDetector a baseline, so the first step on a freshly loaded
+        page can skip the full page-source hash when nothing mutated.
+        """
+        try:
+            return self.driver.execute_script(_ARM_MUTATION_COUNTER_JS)
+        except WebDriverException:
+            return None
+    
+    def _remember_minimal(self, cache_key: Tuple[bytes, bool], minimal_html: str):
+        """Store a minimal DOM in the small LRU, evicting the oldest entry"""
+        self._minimal_cache[cache_key] = minimal_html
+        self._minimal_cache.move_to_end(cache_key)
+        if len(self._minimal_cache) > self.MINIMAL_CACHE_SIZE:
+            self._minimal_cache.popitem(last=False)
     
-    def get_minimal_dom(self, include_verification: bool = True) -> str:
+    def get_minimal_dom(self, include_verification: bool = True, dom_html: Optional[str] = None) -> str:
         """
         ✅ OPTIMIZATION 1: Extract only interactive/relevant elements to reduce token usage
         
         Args:
             include_verification: If True, include elements for verification (messages, totals, etc.)
                                 If False, only include action elements (buttons, inputs, links)
+            dom_html: Page source from get_dom_snapshot(); when omitted, source and minimal
+                      DOM are read from the browser together in one script call
         
         Returns:
             Minimal HTML with only relevant elements (saves ~80-90% tokens)
         """
         try:
-            # Get full DOM
-            full_html = self.driver.page_source
-            soup = BeautifulSoup(full_html, 'html.parser')
-            
-            # Context label for logging
-            context = "Full DOM" if include_verification else "Actions Only"
-            
-            # Interactive selectors (always included)
-            interactive_selectors = [
-                'a',           # Links
-                'button',      # Buttons
-                'input',       # Input fields
-                'select',      # Dropdowns
-                'textarea',    # Text areas
-                'form',        # Forms
-                '[onclick]',   # Clickable elements
-                '[data-qa]',   # Test attributes
-                '[id]',        # Elements with IDs
-                '[class*="btn"]',      # Button-like classes
-                '[class*="link"]',     # Link classes
-            ]
-            
-            # Verification selectors (only if needed)
-            if include_verification:
-                verification_selectors = [
-                    '[class*="alert"]',      # Alert messages
-                    '[class*="message"]',    # Messages
-                    '[class*="error"]',      # Errors
-                    '[class*="success"]',    # Success messages
-                    '[class*="cart"]',       # Cart elements
-                    '[class*="total"]',      # Totals
-                    '[class*="price"]',      # Prices
-                    '[class*="product"]',    # Product elements
-                    '[class*="checkout"]',   # Checkout elements
-                    'img[alt]',              # Images with alt text
-                    'h1', 'h2', 'h3',        # Headers (for context)
-                    '.price',                # Prices
-                    '.total',                # Totals
-                ]
-                all_selectors = interactive_selectors + verification_selectors
+            if dom_html is None:
+                # Source + minimal DOM from one script call (same page state); the
+                # minimal DOM lands in the cache under the source's digest
+                full_html, digest = self.get_dom_snapshot(prefetch_minimal=include_verification)
             else:
-                all_selectors = interactive_selectors
-            
-            # Extract matching elements
-            relevant_elements = []
-            for selector in all_selectors:
-                try:
-                    elements = soup.select(selector)
-                    relevant_elements.extend(elements)
-                except:
-                    continue
+                # Reuse the caller's snapshot
+                full_html, digest = dom_html, self._digest(dom_html)
             
-            # Remove duplicates and build HTML
-            seen = set()
-            unique_elements = []
-            for elem in relevant_elements:
-                elem_str = str(elem)
-                if elem_str not in seen:
-                    seen.add(elem_str)
-                    unique_elements.append(elem)
+            # Minimal DOM is deterministic for a given page source
+            cache_key = (digest, include_verification)
+            cached = self._minimal_cache.get(cache_key)
+            if cached is not None:
+                self._minimal_cache.move_to_end(cache_key)
+                return cached
             
-            # Build minimal HTML
-            minimal_html = "<body>\n"
-            limit = 300 if include_verification else 150
+            # Built from full_html itself - the live page may have moved on since the
+            # snapshot, and the entry must describe the source its key was taken from
+            minimal_html = _minimal_from_html(full_html, include_verification)
             
-            for elem in unique_elements[:limit]:
-                tag = elem.name
-                attrs = {}
-                
-                # Keep only essential attributes
-                if elem.has_attr('id'): attrs['id'] = elem.get('id')
-                if elem.has_attr('class'): attrs['class'] = ' '.join(elem.get('class'))
-                if elem.has_attr('name'): attrs['name'] = elem.get('name')
-                if elem.has_attr('href'): attrs['href'] = elem.get('href')
-                if elem.has_attr('type'): attrs['type'] = elem.get('type')
-                if elem.has_attr('data-qa'): attrs['data-qa'] = elem.get('data-qa')
-                
-                text = elem.get_text(strip=True)[:200]  # Limit text length
-                
-                # Skip empty non-input elements
-                if not text and tag not in ['input', 'button', 'select', 'img']:
-                    continue
-                
-                attr_str = ' '.join([f'{k}="{v}"' for k, v in attrs.items()])
-                minimal_html += f"<{tag} {attr_str}>{text}</{tag}>\n"
-            
-            minimal_html += "</body>"
+            # Context label for logging
+            context = "Full DOM" if include_verification else "Actions Only"
             
             # Calculate reduction
             reduction = 100 - (len(minimal_html) * 100 // len(full_html)) if len(full_html) > 0 else 0
             print(f"[DOMExtractor] {context}: {len(minimal_html)} chars (reduced by {reduction}%)")
             logger.info(f"[DOMExtractor] {context}: {reduction}% reduction")
             
+            self._remember_minimal(cache_key, minimal_html)
+            
             return minimal_html
             
         except Exception as e:
@@ -1025,9 +1427,49 @@ class DOMChangeDetector:
     
     def __init__(self):
         self.last_dom_hash = None
+        self.last_mutation_count = None
+        # Minimal DOMs built for last_minimal_hash: {include_verification: minimal_html}
+        self.last_minimal: Dict[bool, str] = {}
+        self.last_minimal_hash = None
     
-    def has_dom_changed(self, current_hash: str) -> bool:
-        """Check if DOM has changed since last check"""
+    def get_or_recompute(self, extractor: "DOMExtractor", include_verification: bool,
+                         dom_html: Optional[str] = None, dom_hash: Optional[bytes] = None) -> str:
+        """
+        Minimal DOM for the current page, rebuilt only when the DOM hash moved
+        
+        Pass dom_html/dom_hash from get_dom_snapshot() when already fetched.
+        """
+        if dom_html is None:
+            dom_html, dom_hash = extractor.get_dom_snapshot(prefetch_minimal=include_verification)
+        
+        if dom_hash != self.last_minimal_hash:
+            self.last_minimal = {}
+            self.last_minimal_hash = dom_hash
+        
+        minimal_html = self.last_minimal.get(include_verification)
+        if minimal_html is None:
+            minimal_html = extractor.get_minimal_dom(include_verification, dom_html=dom_html)
+            self.last_minimal[include_verification] = minimal_html
+        return minimal_html
+    
+    def has_dom_mutated(self, mutation_count: Optional[int]) -> bool:
+        """
+        Cheap pre-check using the count from DOMExtractor.get_page_state()
+        
+        False only when the in-page counter is unchanged; a missing counter
+        (navigation) counts as mutated so the caller falls back to a full hash.
+        """
+        mutated = mutation_count is None or mutation_count != self.last_mutation_count
+        self.last_mutation_count = mutation_count
+        return mutated
+    
+    def has_dom_changed(self, current_hash: bytes) -> bool:
+        """
+        Check if DOM has changed since last check (compares raw digests)
+        
+        The page is hashed once in C (BLAKE2b) and this is a fixed-size
+        bytes compare - there is no per-character Python loop to speed up here.
+        """
         if self.last_dom_hash is None:
             self.last_dom_hash = current_hash
             return False
@@ -1040,12 +1482,229 @@ class DOMChangeDetector:
 # ============================================================
 # STEP EXECUTOR
 # ============================================================
+# Playwright / jQuery text pseudo-selectors -> (tag, text)
+_HAS_TEXT_RE = re.compile(r"(.+):has-text\(['\"](.+)['\"]\)")
+_CONTAINS_RE = re.compile(r"(.+):contains\(['\"](.+)['\"]\)")
+
+# Inline/class-based error messages shown after a submit, as one CSS union
+_ERROR_SELECTORS = ", ".join((
+    "p[style*='color: red']",
+    "p[style*='color:red']",
+    ".error",
+    ".error-message",
+    ".alert-danger",
+    "[class*='error']",
+    "p.text-danger"
+))
+
+# First visible, non-empty error text on the page ('' if none)
+_ERROR_TEXT_JS = """
+for (const el of document.querySelectorAll(arguments[0])) {
+    const r = el.getBoundingClientRect();
+    if (r.width > 0 && r.height > 0 && getComputedStyle(el).visibility !== 'hidden') {
+        const t = (el.innerText || '').trim();  // undefined on SVG/MathML
+        if (t) return t;
+    }
+}
+return '';
+"""
+
+# Verification keyword sets (matched as substrings of the lowercased text)
+_ERROR_KEYWORDS = frozenset({'error', 'fail', 'invalid', 'incorrect', 'wrong', 'denied'})
+_NEGATIVE_KEYWORDS = frozenset({'incorrect', 'wrong', 'invalid', 'failed', 'denied', 'existing', 'exist'})
+_VALUE_TAGS = frozenset({'input', 'textarea', 'select'})
+
+# Verification phrase -> StepExecutor handler, checked in order
+_VERIFY_DISPATCH = (
+    (("page title contains",), '_verify_title'),
+    (("is visible", "is displayed"), '_verify_visible'),
+    (("text equals", "value equals"), '_verify_text_equals'),
+    (("text contains", "value contains"), '_verify_text_contains'),
+)
+
+# [tag, type, name] of an element, lower-cased tag
+_DESCRIBE_JS = "const e = arguments[0]; return [e.tagName.toLowerCase(), e.type || '', e.getAttribute('name') || ''];"
+
+# All <select> options in one round trip: [element, text, value, index, selected]
+_SELECT_OPTIONS_JS = """
+return Array.from(arguments[0].options, function (o) {
+    return [o, o.text.replace(/\\s+/g, ' ').trim(), o.value, o.index, o.selected];
+});
+"""
+
+# Click-step keywords, matched as whole words so e.g. "bad" does not hit "badge".
+# Inflected forms are listed explicitly; camelCase parts count as words too,
+# so "submitButton" and "SignUp" match like "submit" and "signup".
+_WORD_RE = re.compile(r'[a-z]+')
+_CAMEL_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])')
+_SUBMIT_WORDS = frozenset({
+    'submit', 'submits', 'submitted', 'submitting',
+    'login', 'logins',
+    'register', 'registers', 'registered', 'registering',
+    'signup', 'signups',
+})
+_SUBMIT_PHRASES = ('create account',)
+_NEGATIVE_WORDS = frozenset({
+    'incorrect', 'incorrectly', 'invalid', 'wrong', 'wrongly', 'bad', 'badly',
+    'fail', 'fails', 'failed', 'failing', 'failure', 'failures',
+    'exist', 'exists', 'existed', 'existing', 'nonexistent',
+})
+
+
+def _words(text: str) -> set:
+    """Lower-cased words of text, plus the parts of camelCase words"""
+    return set(_WORD_RE.findall(text.lower())).union(w.lower() for w in _CAMEL_RE.findall(text))
+
+
+def _is_submit_click(description: str) -> bool:
+    """Does a click step submit a form (so errors must be checked afterwards)?"""
+    desc_l = description.lower()
+    return bool(_words(description) & _SUBMIT_WORDS) or any(phrase in desc_l for phrase in _SUBMIT_PHRASES)
+
+
+def _is_negative_test(description: str, test_case: str) -> bool:
+    """Does the step or its test case expect an error (wrong credentials, existing user...)?"""
+    return bool((_words(description) | _words(test_case)) & _NEGATIVE_WORDS)
+
+# Click fallback when an overlay intercepts the native click
+_SCROLL_CLICK_JS = "arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();"
+
+# Set an input's value and fire input/change; returns false when keystrokes are required
+# (password, data-requires-keystrokes) or the element is not an <input>/<textarea>
+_FILL_JS = """
+const el = arguments[0];
+if (el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA') return false;
+if (el.type === 'password' || el.hasAttribute('data-requires-keystrokes')) return false;
+// Typing would be refused or cut short here - leave those cases to send_keys
+if (el.disabled || el.readOnly) return false;
+if (el.maxLength >= 0 && arguments[1].length > el.maxLength) return false;
+// Native value setter from the element's own prototype chain (bypasses framework overrides)
+let proto = Object.getPrototypeOf(el), desc;
+while (proto && !(desc = Object.getOwnPropertyDescriptor(proto, 'value'))) proto = Object.getPrototypeOf(proto);
+if (!desc || !desc.set) return false;
+const setter = desc.set;
+setter.call(el, '');
+setter.call(el, arguments[1]);
+// The browser sanitizes some types (number, date, email...) - typing decides those
+if (el.value !== arguments[1]) return false;
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return true;
+"""
+
+# Coupon "Apply" button: known CSS hooks in priority order, text match as the fallback
+_COUPON_APPLY_SELECTORS = (
+    "button.apply-coupon",
+    "button[type='submit'].coupon",
+    "input[value*='Apply']",
+    ".coupon-apply"
+)
+_COUPON_APPLY_XPATH = "//button[contains(text(),'Apply')]"
+
+# Click the first element matched by the selectors (in order), then the XPath;
+# returns the selector that matched, or null
+_CLICK_FIRST_MATCH_JS = """
+for (const s of arguments[0]) {
+    const e = document.querySelector(s);
+    if (e) { e.click(); return s; }
+}
+const x = document.evaluate(arguments[1], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (x) { x.click(); return arguments[1]; }
+return null;
+"""
+
+# Page settled: document loaded and no jQuery requests pending
+_PAGE_IDLE_JS = "return document.readyState === 'complete' && !(window.jQuery && window.jQuery.active);"
+
+# Step description -> screenshot filename fragment
+_STEP_CLEAN_TRANS = str.maketrans({' ': '_', '/': '_'})
+
+# ASCII case folding for XPath 1.0 translate()
+_XPATH_UPPER = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_XPATH_LOWER = 'abcdefghijklmnopqrstuvwxyz'
+
+# First number in a price/total string, e.g. "Rs. 1,500.00"
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+_COMMA_TRANS = str.maketrans('', '', ',')
+
+
+def _css_string(value: str) -> str:
+    """Quote a value for use inside a CSS attribute selector"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _xpath_literal(value: str) -> str:
+    """Quote a value as an XPath 1.0 string literal (concat() if it has both quote types)"""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat('" + value.replace("'", "', \"'\", '") + "')"
+
+
+@lru_cache(maxsize=512)
+def _classify_selector(selector: str) -> Tuple[str, str]:
+    """
+    Map a step selector to a Selenium (By, locator) pair - computed once per selector
+
+    Playwright :has-text() and jQuery :contains() are converted to XPath, selectors
+    starting with / or ( are XPath, everything else is CSS. Conversions are
+    logged by the caller, since cached calls never reach this body.
+    """
+    if selector.startswith(('/', '(')):
+        return By.XPATH, selector
+
+    # Fast path: plain CSS never reaches the conversion regexes
+    if ":has-text(" not in selector and ":contains(" not in selector:
+        return By.CSS_SELECTOR, selector
+
+    if ":has-text(" in selector:
+        match = _HAS_TEXT_RE.search(selector)
+        if match:
+            return By.XPATH, f"//{match.group(1)}[contains(text(), '{match.group(2)}')]"
+
+    elif ":contains(" in selector:
+        match = _CONTAINS_RE.search(selector)
+        if match:
+            return By.XPATH, f"//{match.group(1)}[contains(text(), '{match.group(2)}')]"
+
+    return By.CSS_SELECTOR, selector
+
+
 class StepExecutor:
+    ELEMENT_CACHE_SIZE = 500
+    
     def __init__(self, driver, test_context, base_url, shopping_site_key):
         self.driver = driver
         self.test_context = test_context
         self.base_url = base_url
         self.shopping_site_key = shopping_site_key
+        # One WebDriverWait per timeout value, reused across steps
+        self._waits: Dict[float, WebDriverWait] = {}
+        # {selector: (page_token, element)}, oldest first - reused while the page is unchanged
+        self._element_cache: "OrderedDict[str, Tuple[Any, Any]]" = OrderedDict()
+        # (mutation_count, url) set by the orchestrator before a step; None = don't trust the cache
+        self.page_token = None
+        # action -> handler, looked up once per step instead of walking an elif chain
+        self._action_handlers = {
+            "navigate": self._do_navigate,
+            "click": self._do_click,
+            "fill": self._do_fill,
+            "select": self._do_select,
+            "submit": self._do_submit,
+            "wait": self._do_wait,
+            "scroll": self._do_scroll,
+            "verify": self._do_verify,
+            "close_alert": self._do_close_alert,
+            "add_to_cart": self._do_add_to_cart,
+            "verify_cart_total": self._do_verify_cart_total,
+            "apply_coupon": self._do_apply_coupon,
+            "dismiss_popup": self._do_dismiss_popup,
+            "wait_for_ajax": self._do_wait_for_ajax,
+        }
+        # Screenshot directory resolved and created once per executor
+        self._screenshots_dir = Path(f"~/automation_product_config/screenshots/{shopping_site_key}").expanduser()
+        self._screenshots_dir.mkdir(parents=True, exist_ok=True)
 
     def get_mode_label(self):
         """Return mode label for logging"""
@@ -1056,131 +1715,116 @@ class StepExecutor:
 
     def _check_for_errors(self):
         """Check if there are any error messages on the page"""
-        error_selectors = [
-            "p[style*='color: red']",
-            "p[style*='color:red']",
-            ".error",
-            ".error-message",
-            ".alert-danger",
-            "[class*='error']",
-            "p.text-danger"
-        ]
-
-        for selector in error_selectors:
-            try:
-                error_elem = self._find_element(selector, timeout=0.5)
-                if error_elem and error_elem.is_displayed():
-                    error_text = error_elem.text.strip()
-                    if error_text:
-                        return True, error_text
-            except:
-                continue
+        # Query, visibility filter and text read all happen in the browser - one round trip
+        try:
+            error_text = self.driver.execute_script(_ERROR_TEXT_JS, _ERROR_SELECTORS)
+        except WebDriverException:
+            # Only a probe - never fail the step because of it
+            return False, ""
+        if error_text:
+            return True, error_text
 
         return False, ""
 
     def capture_failure_screenshot(self, step_info: str = ""):
         """Capture screenshot on test failure"""
         try:
-            import datetime
-
             # Generate timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            # Create screenshots directory with proper structure
-            screenshots_dir = os.path.expanduser(f"~/automation_product_config/screenshots/{self.shopping_site_key}")
-            os.makedirs(screenshots_dir, exist_ok=True)
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
 
             # Create filename with timestamp and step info
-            step_clean = step_info.replace(" ", "_").replace("/", "_")[:50]  # Limit length
+            step_clean = step_info.translate(_STEP_CLEAN_TRANS)[:50]  # Limit length
             filename = f"failure_{timestamp}_{step_clean}.png"
-            filepath = os.path.join(screenshots_dir, filename)
+            filepath = str(self._screenshots_dir / filename)
 
             # Take screenshot
             self.driver.save_screenshot(filepath)
 
             print(f"📸 Screenshot saved: {filepath}")
-            result_logger_gui.info(f"📸 Screenshot saved: {filename}")
-            logger.info(f"Failure screenshot saved to: {filepath}")
+            result_logger_gui.info("📸 Screenshot saved: %s", filename)
+            logger.info("Failure screenshot saved to: %s", filepath)
 
             return filepath
 
         except Exception as e:
             print(f"⚠️ Failed to capture screenshot: {e}")
-            logger.error(f"Screenshot capture failed: {e}")
+            logger.error("Screenshot capture failed: %s", e)
             return None
 
-    def _find_element(self, selector: str, timeout: int = 10):
-        """Find element with wait"""
+    def _get_wait(self, timeout: float) -> WebDriverWait:
+        """Shared WebDriverWait for this timeout"""
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = self._waits[timeout] = WebDriverWait(self.driver, timeout, poll_frequency=0.3)
+        return wait
+
+    def wait_idle(self, timeout: float = 3):
+        """Wait until the page has loaded and no jQuery AJAX is in flight (instead of a fixed sleep)"""
         try:
-            wait = WebDriverWait(self.driver, timeout)
+            self._get_wait(timeout).until(lambda d: d.execute_script(_PAGE_IDLE_JS))
+        except TimeoutException:
+            logger.info("Page still busy after %ss, continuing", timeout)
 
-            # Try CSS selector first
-            try:
-                element = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                return element
-            except Exception as css_error:
-                # Check if it's an invalid selector error (Playwright syntax)
-                error_str = str(css_error).lower()
-                if "invalid selector" in error_str or "syntax" in error_str:
-                    # Try to auto-convert Playwright selectors
-                    if ":has-text(" in selector:
-                        import re
-                        match = re.search(r"(.+):has-text\(['\"](.+)['\"]\)", selector)
-                        if match:
-                            tag = match.group(1)
-                            text = match.group(2)
-                            xpath = f"//{tag}[contains(text(), '{text}')]"
-                            logger.info(f"Auto-converting Playwright selector to XPath: {xpath}")
-                            print(f"🔄 Converted :has-text() to XPath: {xpath}")
-                            try:
-                                element = wait.until(
-                                    EC.presence_of_element_located((By.XPATH, xpath))
-                                )
-                                return element
-                            except:
-                                print(f"⚠️ Converted XPath also failed: {xpath}")
-
-                    elif ":contains(" in selector:
-                        import re
-                        match = re.search(r"(.+):contains\(['\"](.+)['\"]\)", selector)
-                        if match:
-                            tag = match.group(1)
-                            text = match.group(2)
-                            converted_xpath = f"//{tag}[contains(text(), '{text}')]"
-                            logger.info(f"Auto-converting jQuery selector to XPath: {converted_xpath}")
-                            print(f"🔄 Converted :contains() to XPath: {converted_xpath}")
-                            try:
-                                element = wait.until(
-                                    EC.presence_of_element_located((By.XPATH, converted_xpath))
-                                )
-                                return element
-                            except:
-                                print(f"⚠️ Converted XPath also failed: {converted_xpath}")
-
-                    # If conversion failed or not applicable, log and return None
-                    print(f"❌ Invalid selector (Playwright syntax not supported): {selector}")
-                    logger.error(f"Invalid selector: {selector}")
-                    return None
-
-                # Not an invalid selector error, try XPath
-                try:
-                    element = wait.until(
-                        EC.presence_of_element_located((By.XPATH, selector))
-                    )
-                    return element
-                except:
-                    # Both CSS and XPath failed
-                    return None
+    def forget_elements(self):
+        """Drop remembered elements (page navigated or an element went stale)"""
+        self._element_cache.clear()
+        self.page_token = None
 
+    def _find_element(self, selector: str, timeout: int = 10):
+        """Find element with wait"""
+        # Same selector on an unchanged page: reuse the element without a WebDriver round trip
+        token = self.page_token
+        if token is not None:
+            cached = self._element_cache.get(selector)
+            if cached is not None and cached[0] == token:
+                self._element_cache.move_to_end(selector)
+                return cached[1]
+        # CSS vs XPath (and Playwright/jQuery conversion) is decided once per selector
+        locator = _classify_selector(selector)
+        if locator[1] != selector:
+            if ":has-text(" in selector:
+                logger.info(f"Auto-converting Playwright selector to XPath: {locator[1]}")
+                print(f"🔄 Converted :has-text() to XPath: {locator[1]}")
+            else:
+                logger.info(f"Auto-converting jQuery selector to XPath: {locator[1]}")
+                print(f"🔄 Converted :contains() to XPath: {locator[1]}")
+        try:
+            element = self._get_wait(timeout).until(EC.presence_of_element_located(locator))
+            if token is not None:
+                self._element_cache[selector] = (token, element)
+                self._element_cache.move_to_end(selector)
+                if len(self._element_cache) > self.ELEMENT_CACHE_SIZE:
+                    self._element_cache.popitem(last=False)
+            return element
         except TimeoutException:
-            print(f"⏱️ Timeout waiting for element: {selector}")
+            return None
+        except InvalidSelectorException:
+            print(f"❌ Invalid selector (Playwright syntax not supported): {selector}")
+            logger.error(f"Invalid selector: {selector}")
             return None
         except Exception as e:
             print(f"❌ Error finding element {selector}: {e}")
             return None
 
+    def _describe(self, element) -> Tuple[str, str, str]:
+        """Return (tag, type, name) of an element in one round trip"""
+        return tuple(self.driver.execute_script(_DESCRIBE_JS, element))
+
+    def _select_option(self, element, value: str):
+        """Select a <select> option by visible text, then value, then index"""
+        options = self.driver.execute_script(_SELECT_OPTIONS_JS, element)
+
+        chosen = next((o for o in options if o[1] == value), None)
+        if chosen is None:
+            chosen = next((o for o in options if o[2] == value), None)
+        if chosen is None and value.isdigit():
+            chosen = next((o for o in options if o[3] == int(value)), None)
+        if chosen is None:
+            raise NoSuchElementException(f"Cannot locate option with text, value or index: {value}")
+
+        if not chosen[4]:
+            chosen[0].click()
+
     def _verify(self, verification: str, selector: str = None) -> tuple:
         """
         Execute verification check
@@ -1189,98 +1833,98 @@ class StepExecutor:
             tuple: (success: bool, expected: str, actual: str)
         """
         try:
+            v = verification.lower()
+
             # Check if this is an error/failure verification
-            is_error_check = any(keyword in verification.lower() for keyword in [
-                'error', 'fail', 'invalid', 'incorrect', 'wrong', 'denied'
-            ])
-
-            if "page title contains" in verification.lower():
-                expected = verification.split("'")[1]
-                actual = self.driver.title
-                success = expected.lower() in actual.lower()
-                return (success, expected, actual)
-
-            if "is visible" in verification.lower() or "is displayed" in verification.lower():
-                if selector:
-                    element = self._find_element(selector, timeout=5)
-                    element_visible = element is not None and element.is_displayed()
-
-                    if is_error_check:
-                        # Simple: Is there ANY error text visible on the page?
-                        error_exists = element_visible and element is not None
-
-                        # Is this a negative test? (expects error)
-                        is_negative_test = any(keyword in verification.lower() for keyword in [
-                            'incorrect', 'wrong', 'invalid', 'failed', 'denied', 'existing', "exist"
-                        ])
+            is_error_check = any(keyword in v for keyword in _ERROR_KEYWORDS)
 
-                        if is_negative_test:
-                            # Negative test: error SHOULD exist
-                            success = error_exists
-                            expected = "Error message visible"
-                            actual = "Error message visible" if error_exists else "No error message"
-                        else:
-                            # Positive test: error should NOT exist
-                            success = not error_exists
-                            expected = "No error message"
-                            actual = "Error message visible" if error_exists else "No error message"
-                    else:
-                        # Normal check: if element visible = SUCCESS
-                        success = element_visible
-                        expected = "Element visible"
-                        actual = "Element visible" if success else "Element not found or not visible"
+            # First matching phrase decides the check (order matters)
+            for phrases, method_name in _VERIFY_DISPATCH:
+                if any(phrase in v for phrase in phrases):
+                    return getattr(self, method_name)(verification, v, selector, is_error_check)
 
-                    return (success, expected, actual)
-                return (True, "Element visible", "Element visible")
+            # Default: check for error keywords
+            if is_error_check:
+                # If it's an error check and we get here, assume no error = success
+                return (True, "No error", "No error")
 
-            if "text equals" in verification.lower() or "value equals" in verification.lower():
-                if selector:
-                    element = self._find_element(selector, timeout=5)
-                    if element:
-                        expected = verification.split("'")[1] if "'" in verification else verification
+            # Default: assume verification passed
+            return (True, verification, "Passed")
 
-                        # Auto-detect if it's an input field
-                        tag_name = element.tag_name.lower()
-                        if tag_name in ['input', 'textarea', 'select']:
-                            actual = element.get_attribute('value') or ""
-                        else:
-                            actual = element.text.strip()
+        except Exception as e:
+            if isinstance(e, StaleElementReferenceException) and self.page_token is not None:
+                raise  # A remembered element went stale - execute_step looks it up again
+            logger.error(f"Verification error: {e}")
+            return (False, verification, f"Error: {str(e)}")
 
-                        success = expected.lower() == actual.lower()
-                        return (success, expected, actual)
-                    return (False, verification.split("'")[1] if "'" in verification else "Text", "Element not found")
-                return (True, "Text match", "Text match")
+    def _verify_title(self, verification: str, v: str, selector: str, is_error_check: bool) -> tuple:
+        expected = verification.split("'")[1]
+        actual = self.driver.title
+        success = expected.lower() in actual.lower()
+        return (success, expected, actual)
 
-            if "text contains" in verification.lower() or "value contains" in verification.lower():
-                if selector:
-                    element = self._find_element(selector, timeout=5)
-                    if element:
-                        expected = verification.split("'")[1] if "'" in verification else verification
+    def _verify_visible(self, verification: str, v: str, selector: str, is_error_check: bool) -> tuple:
+        if not selector:
+            return (True, "Element visible", "Element visible")
 
-                        # Auto-detect if it's an input field
-                        tag_name = element.tag_name.lower()
-                        if tag_name in ['input', 'textarea', 'select']:
-                            actual = element.get_attribute('value') or ""
-                        else:
-                            actual = element.text.strip()
+        element = self._find_element(selector, timeout=5)
+        element_visible = element is not None and element.is_displayed()
 
-                        success = expected.lower() in actual.lower()
-                        return (success, expected, actual)
-                    return (False, verification.split("'")[1] if "'" in verification else "Text", "Element not found")
-                return (True, "Text contains", "Text contains")
+        if is_error_check:
+            # Simple: Is there ANY error text visible on the page?
+            error_exists = element_visible and element is not None
 
-            # Default: check for error keywords
-            if is_error_check:
-                # If it's an error check and we get here, assume no error = success
-                return (True, "No error", "No error")
+            # Is this a negative test? (expects error)
+            is_negative_test = any(keyword in v for keyword in _NEGATIVE_KEYWORDS)
 
-            # Default: assume verification passed
-            return (True, verification, "Passed")
+            if is_negative_test:
+                # Negative test: error SHOULD exist
+                success = error_exists
+                expected = "Error message visible"
+                actual = "Error message visible" if error_exists else "No error message"
+            else:
+                # Positive test: error should NOT exist
+                success = not error_exists
+                expected = "No error message"
+                actual = "Error message visible" if error_exists else "No error message"
+        else:
+            # Normal check: if element visible = SUCCESS
+            success = element_visible
+            expected = "Element visible"
+            actual = "Element visible" if success else "Element not found or not visible"
+
+        return (success, expected, actual)
+
+    def _verify_text_equals(self, verification: str, v: str, selector: str, is_error_check: bool) -> tuple:
+        if not selector:
+            return (True, "Text match", "Text match")
+        return self._verify_text(verification, selector, exact=True)
+
+    def _verify_text_contains(self, verification: str, v: str, selector: str, is_error_check: bool) -> tuple:
+        if not selector:
+            return (True, "Text contains", "Text contains")
+        return self._verify_text(verification, selector, exact=False)
+
+    def _verify_text(self, verification: str, selector: str, exact: bool) -> tuple:
+        element = self._find_element(selector, timeout=5)
+        if not element:
+            return (False, verification.split("'")[1] if "'" in verification else "Text", "Element not found")
+
+        expected = verification.split("'")[1] if "'" in verification else verification
+
+        # Auto-detect if it's an input field
+        tag_name = element.tag_name.lower()
+        if tag_name in _VALUE_TAGS:
+            actual = element.get_attribute('value') or ""
+        else:
+            actual = element.text.strip()
+
+        if exact:
+            success = expected.lower() == actual.lower()
+        else:
+            success = expected.lower() in actual.lower()
+        return (success, expected, actual)
 
-        except Exception as e:
-            logger.error(f"Verification error: {e}")
-            return (False, verification, f"Error: {str(e)}")
-    
     def execute_step(self, step: Dict[str, Any]) -> bool:
         """
         Execute a single test step
@@ -1296,463 +1940,466 @@ class StepExecutor:
             description = step.get("description", "")
             wait_seconds = step.get("wait_seconds", 1)
             
-            # Log step
-            print(f"\n{'='*70}")
-            print(f"Step {step_num}: {description}")
-            print(f"Action: {action}")
-            print(f"Description: {description}")
+            # Log step - header built once, written in a single call
+            header = [f"\n{_BIGSEP}", f"Step {step_num}: {description}", f"Action: {action}"]
             if selector:
-                print(f"Selector: {selector}")
+                header.append(f"Selector: {selector}")
             if value:
-                print(f"Value: {value}")
-            print(f"{'='*70}")
+                header.append(f"Value: {value}")
+            header.append(_BIGSEP)
+            print("\n".join(header))
             
             # Execute based on action type
-            if action == "navigate":
-                url = value or step.get("url")
-                if url:
-                    # Fix relative URLs
-                    if url.startswith('/'):
-                        # Relative URL - prepend base URL
-                        base_url = self.base_url
-                        url = base_url.rstrip('/') + url
-                    elif not url.startswith('http'):
-                        # No protocol - add https://
-                        url = 'https://' + url
-
-                    logger.info(f"Navigating to {url}")
-                    logger.info(f"-" * 70)
-
-                    self.driver.get(url)
-                    logger.info(f"Successfully navigated to {url}")
-
-            elif action == "click":
-                logger.info(f"\nClicking: {description}")
-                logger.info("-" * 70)
-
-                element = self._find_element(selector)
-                if element:
-                    try:
-                        # Method 1: Try normal click first (fastest)
-                        element.click()
-                        logger.info(f"Successfully clicked element: {selector}")
-                        is_submit = any(word in description.lower() for word in
-                                        ['submit', 'login', 'register', 'signup', 'create account'])
-
-                        if is_submit:
-                            time.sleep(2)  # Wait for page to process
-
-                            # Check for error messages
-                            test_case = step.get("test_case", "")
-                            is_negative_test = any(keyword in description.lower() for keyword in [
-                                'incorrect', 'invalid', 'wrong', 'bad', 'fail', 'existing', 'exist'
-                            ]) or any(keyword in test_case.lower() for keyword in [
-                                'incorrect', 'invalid', 'wrong', 'bad', 'fail', 'existing', 'exist'
-                            ])
-
-                            # Check for error messages
-                            has_error, error_text = self._check_for_errors()
-
-                            if has_error:
-                                if is_negative_test:
-                                    # Error is EXPECTED in negative tests - this is SUCCESS!
-                                    print(f"✅ Expected error found (negative test): {error_text}")
-                                    result_logger_gui.info(f"✅ Expected error: {error_text}")
-                                    logger.info(f"Negative test passed - error correctly shown: {error_text}")
-                                    # Don't return False - continue to next step!
-                                else:
-                                    # Error is UNEXPECTED in positive tests - this is FAILURE!
-                                    print(f"❌ Unexpected error (positive test): {error_text}")
-                                    result_logger_gui.error(f"Form error: {error_text}")
-                                    logger.error(f"Form submission failed with error: {error_text}")
-                                    self.capture_failure_screenshot(f"form_error_{error_text[:30]}")
-                                    return False
-
-                    except ElementClickInterceptedException:
-                        # Element is blocked by ad, modal, or other overlay
-                        logger.warning(f"Normal click blocked (likely by ad), trying alternatives...")
-                        result_logger_gui.warning(f"⚠️ Click blocked by overlay, using fallback...")
-
-                        try:
-                            # Method 2: Scroll element to center of viewport and retry
-                            self.driver.execute_script(
-                                "arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", element)
-                            time.sleep(0.5)  # Wait for scroll
-                            element.click()
-                            result_logger_gui.info(f"✓ Clicked after scrolling")
-                            logger.info(f"Successfully clicked after scrolling: {selector}")
-                        except:
-                            try:
-                                # Method 3: JavaScript click (bypasses all overlays)
-                                self.driver.execute_script("arguments[0].click();", element)
-                                result_logger_gui.info(f"✓ Clicked with JavaScript")
-                                logger.info(f"Successfully clicked with JavaScript: {selector}")
-                            except Exception as e:
-                                result_logger_gui.error(f"✗ All click methods failed: {e}")
-                                logger.error(f"All click methods failed for {selector}: {e}")
-                                self.capture_failure_screenshot(f"all_click_methods_failed")
-                                return False
-                else:
-                    result_logger_gui.info(f"✗ Failed to find element: {selector}")
-                    logger.error(f"Element not found for click: {selector}")
-                    self.capture_failure_screenshot(f"element_not_found_for_click")
-                    return False
+            handler = self._action_handlers.get(action, self._do_unknown)
+            try:
+                ok = handler(step, step_num, selector, value, description, wait_seconds)
+            except StaleElementReferenceException:
+                if self.page_token is None:
+                    raise
+                # A remembered element went stale - look everything up again once
+                self.forget_elements()
+                ok = handler(step, step_num, selector, value, description, wait_seconds)
+            # Remembered elements are trusted again only after the orchestrator re-checks the page
+            self.page_token = None
+            if not ok:
+                return False
             
-            elif action == "fill":
-                result_logger_gui.info(f"Filling field: {description}")
-
-                element = self._find_element(selector)
-                if element:
-                    element.clear()
-                    element.send_keys(value)
-                    # Mask password in logs
-                    display_value = "****" if "password" in description.lower() else value
-                    result_logger_gui.info(f"✓ Entered: {display_value}")
-                    result_logger_gui.info("-" * 70)
-                    logger.info(f"Successfully filled element {selector} with value")
-                else:
-                    result_logger_gui.info(f"✗ Failed to find field: {selector}")
-                    logger.error(f"Element not found for fill: {selector}")
-                    self.capture_failure_screenshot(f"element_not_found_for_fill")
-                    return False
+            # Wait after step
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error executing step: {e}")
+            result_logger_gui.error("[Step %s] Error: %s", step.get('step_number', '?'), e)
+            import traceback
+            traceback.print_exc()
+            self.capture_failure_screenshot(f"error_executing_step")
+            return False
 
+    # ===== ACTION HANDLERS (dispatched from execute_step) =====
 
-            elif action == "select":
+    def _do_navigate(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        url = value or step.get("url")
+        if url:
+            # Fix relative URLs
+            if url.startswith('/'):
+                # Relative URL - prepend base URL
+                base_url = self.base_url
+                url = base_url.rstrip('/') + url
+            elif not url.startswith('http'):
+                # No protocol - add https://
+                url = 'https://' + url
 
-                result_logger_gui.info(f"Selecting option: {description}")
+            logger.info("Navigating to %s", url)
+            logger.info(_SEP)
 
+            self.driver.get(url)
+            logger.info("Successfully navigated to %s", url)
 
-                element = self._find_element(selector)
+        return True
 
-                if element:
+    def _do_click(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        logger.info("\nClicking: %s", description)
+        logger.info(_SEP)
 
-                    tag_name = element.tag_name.lower()
+        element = self._find_element(selector)
+        if element:
+            try:
+                # Method 1: Try normal click first (fastest)
+                element.click()
+                logger.info("Successfully clicked element: %s", selector)
+                is_submit = _is_submit_click(description)
 
-                    # Check if it's actually a <select> element
+                if is_submit:
+                    time.sleep(2)  # Wait for page to process
 
-                    if tag_name == 'select':
+                    # Check for error messages
+                    is_negative_test = _is_negative_test(description, step.get("test_case", ""))
 
-                        # Standard dropdown
+                    # Check for error messages
+                    has_error, error_text = self._check_for_errors()
 
-                        from selenium.webdriver.support.ui import Select
+                    if has_error:
+                        if is_negative_test:
+                            # Error is EXPECTED in negative tests - this is SUCCESS!
+                            print(f"✅ Expected error found (negative test): {error_text}")
+                            result_logger_gui.info("✅ Expected error: %s", error_text)
+                            logger.info("Negative test passed - error correctly shown: %s", error_text)
+                            # Don't return False - continue to next step!
+                        else:
+                            # Error is UNEXPECTED in positive tests - this is FAILURE!
+                            print(f"❌ Unexpected error (positive test): {error_text}")
+                            result_logger_gui.error("Form error: %s", error_text)
+                            logger.error("Form submission failed with error: %s", error_text)
+                            self.capture_failure_screenshot(f"form_error_{error_text[:30]}")
+                            return False
 
-                        select = Select(element)
+            except ElementClickInterceptedException:
+                # Element is blocked by ad, modal, or other overlay
+                logger.warning("Normal click blocked (likely by ad), trying alternatives...")
+                result_logger_gui.warning("⚠️ Click blocked by overlay, using fallback...")
 
-                        try:
+                try:
+                    # Fallback: scroll to center and click inside the browser in one round trip
+                    # (a JS click bypasses overlays, no scroll wait needed)
+                    self.driver.execute_script(_SCROLL_CLICK_JS, element)
+                    result_logger_gui.info("✓ Clicked with JavaScript")
+                    logger.info("Successfully clicked with JavaScript: %s", selector)
+                except WebDriverException as e:
+                    result_logger_gui.error("✗ All click methods failed: %s", e)
+                    logger.error("All click methods failed for %s: %s", selector, e)
+                    self.capture_failure_screenshot(f"all_click_methods_failed")
+                    return False
+        else:
+            result_logger_gui.info("✗ Failed to find element: %s", selector)
+            logger.error("Element not found for click: %s", selector)
+            self.capture_failure_screenshot(f"element_not_found_for_click")
+            return False
 
-                            select.select_by_visible_text(str(value))
+        return True
 
-                        except:
+    def _do_fill(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        result_logger_gui.info("Filling field: %s", description)
 
-                            try:
+        element = self._find_element(selector)
+        if element:
+            desc_l = description.lower()
+            text = "" if value is None else str(value)
+            # One JS assignment + input/change events; real keystrokes only where a
+            # site listens for them (password, autocomplete, data-requires-keystrokes)
+            # or the script can't set the value
+            filled = False
+            if "autocomplete" not in desc_l:
+                try:
+                    filled = self.driver.execute_script(_FILL_JS, element, text)
+                except WebDriverException as e:
+                    logger.info("JS fill failed for %s, typing instead: %s", selector, e)
+            if not filled:
+                element.clear()
+                element.send_keys(text)
+            # Mask password in logs
+            display_value = "****" if "password" in desc_l else value
+            result_logger_gui.info("✓ Entered: %s", display_value)
+            result_logger_gui.info(_SEP)
+            logger.info("Successfully filled element %s with value", selector)
+        else:
+            result_logger_gui.info("✗ Failed to find field: %s", selector)
+            logger.error("Element not found for fill: %s", selector)
+            self.capture_failure_screenshot(f"element_not_found_for_fill")
+            return False
 
-                                select.select_by_value(str(value))
+        return True
 
-                            except:
+    def _do_select(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        result_logger_gui.info("Selecting option: %s", description)
 
-                                if str(value).isdigit():
 
-                                    select.select_by_index(int(value))
+        element = self._find_element(selector)
 
-                                else:
+        if element:
 
-                                    raise
+            tag_name, element_type, name = self._describe(element)
 
-                        result_logger_gui.info(f"✓ Selected: {value}")
-                        result_logger_gui.info("-" * 70)
+            # Check if it's actually a <select> element
 
-                        logger.info(f"Successfully selected value '{value}' in {selector}")
+            if tag_name == 'select':
 
+                # Standard dropdown - one options query, match text -> value -> index
 
-                    elif tag_name == 'input' and element.get_attribute('type') == 'radio':
+                self._select_option(element, str(value))
 
-                        # It's a radio button - find the specific one with this value
+                result_logger_gui.info("✓ Selected: %s", value)
+                result_logger_gui.info(_SEP)
 
-                        logger.info(f"Element is a radio button, finding option with value '{value}'")
+                logger.info("Successfully selected value '%s' in %s", value, selector)
 
-                        # Get the name attribute
 
-                        name = element.get_attribute('name')
+            elif tag_name == 'input' and element_type == 'radio':
 
-                        # Find all radio buttons with this name
+                # It's a radio button - find the specific one with this value
 
-                        radio_buttons = self.driver.find_elements(By.CSS_SELECTOR,
-                                                                  f"input[type='radio'][name='{name}']")
+                logger.info("Element is a radio button, finding option with value '%s'", value)
 
-                        # Find the one matching the value
+                # Radio with this name whose value matches (CSS 'i' flag = case-insensitive)
 
-                        clicked = False
+                clicked = False
 
-                        for radio in radio_buttons:
+                matching = self.driver.find_elements(
+                    By.CSS_SELECTOR,
+                    f"input[type='radio'][name={_css_string(name)}][value={_css_string(str(value))} i]")
 
-                            radio_value = radio.get_attribute('value')
+                if matching:
+                    matching[0].click()
 
-                            # Check if value matches (case-insensitive)
+                    result_logger_gui.info("✓ Selected radio: %s", value)
+                    result_logger_gui.info(_SEP)
 
-                            if radio_value and radio_value.lower() == str(value).lower():
-                                radio.click()
+                    logger.info("Successfully selected radio button: %s", value)
 
-                                result_logger_gui.info(f"✓ Selected radio: {value}")
-                                result_logger_gui.info("-" * 70)
+                    clicked = True
 
-                                logger.info(f"Successfully selected radio button: {value}")
+                else:
 
-                                clicked = True
+                    # Try matching by the label next to the radio, in one XPath query
 
-                                break
+                    matching = self.driver.find_elements(
+                        By.XPATH,
+                        f"//input[@type='radio'][@name={_xpath_literal(name)}]"
+                        f"[following-sibling::*[1][contains(translate(., '{_XPATH_UPPER}', '{_XPATH_LOWER}'), "
+                        f"{_xpath_literal(str(value).lower())})]]")
 
-                        if not clicked:
+                    if matching:
+                        matching[0].click()
 
-                            # Try matching by label text
+                        result_logger_gui.info("✓ Selected radio: %s", value)
+                        result_logger_gui.info(_SEP)
+                        logger.info("Successfully selected radio button by label: %s", value)
 
-                            for radio in radio_buttons:
+                        clicked = True
 
-                                # Look for label next to this radio
+                if not clicked:
+                    result_logger_gui.error("✗ Could not find radio option: %s", value)
+                    logger.error("Radio option not found: %s", value)
+                    self.capture_failure_screenshot(f"radio_option_not_found")
+                    return False
 
-                                try:
 
-                                    label = radio.find_element(By.XPATH, "./following-sibling::*[1]")
+            else:
 
-                                    if value.lower() in label.text.lower():
-                                        radio.click()
+                # Unknown element type for select
 
-                                        result_logger_gui.info(f"✓ Selected radio: {value}")
-                                        result_logger_gui.info("-" * 70)
-                                        logger.info(f"Successfully selected radio button by label: {value}")
+                result_logger_gui.error("✗ Select action requires <select> or radio buttons, got <%s>", tag_name)
+                logger.error("Invalid element type for select: %s", tag_name)
+                self.capture_failure_screenshot(f"invalid_element_type_for_select")
+                return False
 
-                                        clicked = True
+        return True
 
-                                        break
+    def _do_submit(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        result_logger_gui.info("Submitting form: %s", description)
+        result_logger_gui.info(_SEP)
 
-                                except:
+        element = self._find_element(selector)
+        if element:
+            element.submit()
+            result_logger_gui.info("✓ Form submitted")
+            logger.info("Successfully submitted form: %s", selector)
+        else:
+            result_logger_gui.info("✗ Failed to find form: %s", selector)
+            logger.error("Element not found for submit: %s", selector)
+            self.capture_failure_screenshot(f"element_not_found_for_submit")
+            return False
 
-                                    pass
+        return True
 
-                        if not clicked:
-                            result_logger_gui.error(f"✗ Could not find radio option: {value}")
-                            logger.error(f"Radio option not found: {value}")
-                            self.capture_failure_screenshot(f"radio_option_not_found")
-                            return False
+    def _do_wait(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        time.sleep(wait_seconds)
+        result_logger_gui.info("[Step %s] Waited %ss", step_num, wait_seconds)
 
+        return True
 
-                    else:
+    def _do_scroll(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        result_logger_gui.info("Scrolling: %s", description)
+        result_logger_gui.info(_SEP)
 
-                        # Unknown element type for select
+        if selector:
+            element = self._find_element(selector)
+            if element:
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+                result_logger_gui.info("✓ Scrolled to element")
+                logger.info("Scrolled to element: %s", selector)
+        else:
+            # Scroll to bottom
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            result_logger_gui.info("✓ Scrolled to bottom")
+            logger.info("Scrolled to page bottom")
 
-                        result_logger_gui.error(f"✗ Select action requires <select> or radio buttons, got <{tag_name}>")
-                        logger.error(f"Invalid element type for select: {tag_name}")
-                        self.capture_failure_screenshot(f"invalid_element_type_for_select")
-                        return False
-            
-            elif action == "submit":
-                result_logger_gui.info(f"Submitting form: {description}")
-                result_logger_gui.info("-"*70)
-                
-                element = self._find_element(selector)
-                if element:
-                    element.submit()
-                    result_logger_gui.info("✓ Form submitted")
-                    logger.info(f"Successfully submitted form: {selector}")
-                else:
-                    result_logger_gui.info(f"✗ Failed to find form: {selector}")
-                    logger.error(f"Element not found for submit: {selector}")
-                    self.capture_failure_screenshot(f"element_not_found_for_submit")
-                    return False
-            
-            elif action == "wait":
-                time.sleep(wait_seconds)
-                result_logger_gui.info(f"[Step {step_num}] Waited {wait_seconds}s")
-            
-            elif action == "scroll":
-                result_logger_gui.info(f"Scrolling: {description}")
-                result_logger_gui.info("-"*70)
-                
-                if selector:
-                    element = self._find_element(selector)
-                    if element:
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                        result_logger_gui.info("✓ Scrolled to element")
-                        logger.info(f"Scrolled to element: {selector}")
-                else:
-                    # Scroll to bottom
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    result_logger_gui.info("✓ Scrolled to bottom")
-                    logger.info("Scrolled to page bottom")
-            
-            elif action == "verify":
-                result_logger_gui.info(f"Validating: {description}")
-                #result_logger_gui.info("-"*70)
-                
-                verification = step.get("verification", "")
-                success, expected, actual = self._verify(verification, selector)
-                
-                if success:
-                    result_logger_gui.info(f"✓ Validation passed")
-                    logger.info(f"Verification passed: {verification}")
-                    result_logger_gui.info("-" * 70)
-                else:
-                    result_logger_gui.info(f"✗ Validation failed")
-                    result_logger_gui.info(f"  Expected: {expected}")
-                    result_logger_gui.info(f"  Actual: {actual}")
-                    logger.warning(f"Verification failed - Expected: {expected}, Actual: {actual}")
-                    self.capture_failure_screenshot(f"verify_failed_{verification[:50]}")
-                    return False
+        return True
 
-            elif action == "close_alert":
-                try:
-                    alert = self.driver.switch_to.alert
-                    alert_text = alert.text
-                    alert.accept()
-                    result_logger_gui.info(f"Closed alert: {alert_text}")
-                    result_logger_gui.info("-"*70)
-                    logger.info(f"Closed alert with text: {alert_text}")
-                except:
-                    logger.warning("No alert present to close")
-                    pass
-            
-            # ===== SHOPPING-SPECIFIC ACTIONS =====
-            
-            elif action == "add_to_cart":
-                item_name = step.get("item_name", "Unknown Item")
-                price = float(step.get("price", 0))
-                quantity = int(step.get("quantity", 1))
-                
-                if self.test_context:
-                    self.test_context.add_to_cart(item_name, price, quantity)
-                
-                result_logger_gui.info(f"[Step {step_num}] Tracked cart item: {item_name}")
-                print(f"✅ Tracked in cart: {item_name} x{quantity} @ ${price}")
-            
-            elif action == "verify_cart_total":
-                if not self.test_context:
-                    print("⚠️ No test context for cart verification")
-                    return True
-                
-                try:
-                    total_element = self._find_element(selector)
-                    if total_element:
-                        actual_total_text = total_element.text.strip()
-                        import re
-                        numbers = re.findall(r'[\d,]+\.?\d*', actual_total_text)
-                        if numbers:
-                            actual_total = float(numbers[0].replace(',', ''))
-                            expected_total = self.test_context.expected_cart_total
-                            
-                            print(f"[Cart Verify] Expected: ${expected_total:.2f}")
-                            print(f"[Cart Verify] Actual: ${actual_total:.2f}")
-                            
-                            if abs(actual_total - expected_total) < 0.01:
-                                print(f"✅ Cart total verified!")
-                                result_logger_gui.info(f"[Step {step_num}] ✅ Cart total verified: ${actual_total:.2f}")
-                            else:
-                                print(f"❌ Cart total mismatch!")
-                                result_logger_gui.error(f"[Step {step_num}] ❌ Expected ${expected_total:.2f}, got ${actual_total:.2f}")
-                                self.capture_failure_screenshot(f"cart_total_mismatch")
-                                return False
-                        else:
-                            print("⚠️ Could not parse total from page")
-                            self.capture_failure_screenshot(f"cant_parse_total_from_page")
-                            return False
+    def _do_verify(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        result_logger_gui.info("Validating: %s", description)
+        #result_logger_gui.info(_SEP)
+
+        verification = step.get("verification", "")
+        success, expected, actual = self._verify(verification, selector)
+
+        if success:
+            result_logger_gui.info("✓ Validation passed")
+            logger.info("Verification passed: %s", verification)
+            result_logger_gui.info(_SEP)
+        else:
+            result_logger_gui.info("✗ Validation failed")
+            result_logger_gui.info("  Expected: %s", expected)
+            result_logger_gui.info("  Actual: %s", actual)
+            logger.warning("Verification failed - Expected: %s, Actual: %s", expected, actual)
+            self.capture_failure_screenshot(f"verify_failed_{verification[:50]}")
+            return False
+
+        return True
+
+    def _do_close_alert(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        try:
+            alert = self.driver.switch_to.alert
+            alert_text = alert.text
+            alert.accept()
+            result_logger_gui.info("Closed alert: %s", alert_text)
+            result_logger_gui.info(_SEP)
+            logger.info("Closed alert with text: %s", alert_text)
+        except NoAlertPresentException:
+            logger.warning("No alert present to close")
+            pass
+
+        return True
+
+    # ===== SHOPPING-SPECIFIC ACTIONS =====
+    def _do_add_to_cart(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        item_name = step.get("item_name", "Unknown Item")
+        price = float(step.get("price", 0))
+        quantity = int(step.get("quantity", 1))
+
+        if self.test_context:
+            self.test_context.add_to_cart(item_name, price, quantity)
+
+        result_logger_gui.info("[Step %s] Tracked cart item: %s", step_num, item_name)
+        print(f"✅ Tracked in cart: {item_name} x{quantity} @ ${price}")
+
+        return True
+
+    def _do_verify_cart_total(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        if not self.test_context:
+            print("⚠️ No test context for cart verification")
+            return True
+
+        try:
+            total_element = self._find_element(selector)
+            if total_element:
+                actual_total_text = total_element.text.strip()
+                number = _PRICE_RE.search(actual_total_text)
+                if number:
+                    actual_total = float(number.group(0).translate(_COMMA_TRANS))
+                    expected_total = self.test_context.expected_cart_total
+
+                    print(f"[Cart Verify] Expected: ${expected_total:.2f}")
+                    print(f"[Cart Verify] Actual: ${actual_total:.2f}")
+
+                    if abs(actual_total - expected_total) < 0.01:
+                        print(f"✅ Cart total verified!")
+                        result_logger_gui.info(f"[Step {step_num}] ✅ Cart total verified: ${actual_total:.2f}")
                     else:
-                        print(f"❌ Cart total element not found: {selector}")
-                        self.capture_failure_screenshot(f"cart_total_element_not_found")
+                        print(f"❌ Cart total mismatch!")
+                        result_logger_gui.error(f"[Step {step_num}] ❌ Expected ${expected_total:.2f}, got ${actual_total:.2f}")
+                        self.capture_failure_screenshot(f"cart_total_mismatch")
                         return False
-                except Exception as e:
-                    print(f"❌ Error verifying cart: {e}")
-                    result_logger_gui.error(f"[Step {step_num}] Error verifying cart: {e}")
-                    self.capture_failure_screenshot(f"error_verifying_cart")
-                    return False
-            
-            elif action == "apply_coupon":
-                code = step.get("code", "")
-                discount = float(step.get("discount", 0))
-                
-                coupon_input = self._find_element(selector)
-                if coupon_input:
-                    coupon_input.clear()
-                    coupon_input.send_keys(code)
-                    result_logger_gui.info(f"[Step {step_num}] Entered coupon: {code}")
-                    
-                    # Try to find and click apply button
-                    apply_selectors = [
-                        "button.apply-coupon",
-                        "button[type='submit'].coupon",
-                        "input[value*='Apply']",
-                        ".coupon-apply",
-                        "button:contains('Apply')"
-                    ]
-                    
-                    applied = False
-                    for apply_sel in apply_selectors:
-                        try:
-                            apply_btn = self._find_element(apply_sel, timeout=2)
-                            if apply_btn:
-                                apply_btn.click()
-                                applied = True
-                                break
-                        except:
-                            continue
-                    
-                    if applied:
-                        time.sleep(2)
-                        if self.test_context:
-                            self.test_context.apply_coupon(code, discount)
-                        print(f"✅ Applied coupon: {code}")
-                        result_logger_gui.info(f"[Step {step_num}] ✅ Applied coupon: {code}")
-                    else:
-                        print(f"⚠️ Coupon entered but could not find apply button")
-                        result_logger_gui.warning(f"[Step {step_num}] Could not find apply button")
                 else:
-                    print(f"❌ Coupon input not found: {selector}")
-                    self.capture_failure_screenshot(f"coupon_input_not_found")
+                    print("⚠️ Could not parse total from page")
+                    self.capture_failure_screenshot(f"cant_parse_total_from_page")
                     return False
-            
-            elif action == "dismiss_popup":
-                try:
-                    popup_element = self._find_element(selector, timeout=3)
-                    if popup_element:
-                        popup_element.click()
-                        time.sleep(0.5)
-                        print(f"✅ Dismissed popup: {selector}")
-                        result_logger_gui.info(f"[Step {step_num}] Dismissed popup")
-                    else:
-                        print(f"⚠️ Popup not found (may have auto-closed): {selector}")
-                except Exception as e:
-                    print(f"⚠️ Popup already gone or error: {e}")
-            
-            elif action == "wait_for_ajax":
-                loading_selector = selector or ".loading-spinner"
-                max_wait = wait_seconds or 10
-                
-                try:
-                    WebDriverWait(self.driver, max_wait).until(
-                        EC.invisibility_of_element_located((By.CSS_SELECTOR, loading_selector))
-                    )
-                    print(f"✅ AJAX loading complete")
-                    result_logger_gui.info(f"[Step {step_num}] AJAX complete")
-                except:
-                    print(f"⚠️ No loading indicator found: {loading_selector}")
-                
-                time.sleep(1)
-            
             else:
-                print(f"⚠️ Unknown action: {action}")
-                result_logger_gui.warning(f"[Step {step_num}] Unknown action: {action}")
-            
-            # Wait after step
-            if wait_seconds > 0:
-                time.sleep(wait_seconds)
-            
-            return True
-            
+                print(f"❌ Cart total element not found: {selector}")
+                self.capture_failure_screenshot(f"cart_total_element_not_found")
+                return False
         except Exception as e:
-            print(f"❌ Error executing step: {e}")
-            result_logger_gui.error(f"[Step {step.get('step_number', '?')}] Error: {e}")
-            import traceback
-            traceback.print_exc()
-            self.capture_failure_screenshot(f"error_executing_step")
+            if isinstance(e, StaleElementReferenceException) and self.page_token is not None:
+                raise  # A remembered element went stale - execute_step looks it up again
+            print(f"❌ Error verifying cart: {e}")
+            result_logger_gui.error("[Step %s] Error verifying cart: %s", step_num, e)
+            self.capture_failure_screenshot(f"error_verifying_cart")
             return False
 
+        return True
+
+    def _do_apply_coupon(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        code = step.get("code", "")
+        discount = float(step.get("discount", 0))
+
+        coupon_input = self._find_element(selector)
+        if coupon_input:
+            coupon_input.clear()
+            coupon_input.send_keys(code)
+            result_logger_gui.info("[Step %s] Entered coupon: %s", step_num, code)
+
+            # Try to find and click apply button
+            # Selectors are tried in priority order and clicked inside the browser - one round trip
+            try:
+                applied_by = self.driver.execute_script(
+                    _CLICK_FIRST_MATCH_JS, list(_COUPON_APPLY_SELECTORS), _COUPON_APPLY_XPATH)
+            except WebDriverException as e:
+                logger.warning("Coupon apply click failed: %s", e)
+                applied_by = None
+            applied = applied_by is not None
+
+            if applied:
+                self.wait_idle()
+                if self.test_context:
+                    self.test_context.apply_coupon(code, discount)
+                print(f"✅ Applied coupon: {code}")
+                result_logger_gui.info("[Step %s] ✅ Applied coupon: %s", step_num, code)
+            else:
+                print(f"⚠️ Coupon entered but could not find apply button")
+                result_logger_gui.warning("[Step %s] Could not find apply button", step_num)
+        else:
+            print(f"❌ Coupon input not found: {selector}")
+            self.capture_failure_screenshot(f"coupon_input_not_found")
+            return False
+
+        return True
+
+    def _do_dismiss_popup(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        try:
+            popup_element = self._find_element(selector, timeout=3)
+            if popup_element:
+                popup_element.click()
+                self.wait_idle()
+                print(f"✅ Dismissed popup: {selector}")
+                result_logger_gui.info("[Step %s] Dismissed popup", step_num)
+            else:
+                print(f"⚠️ Popup not found (may have auto-closed): {selector}")
+        except Exception as e:
+            if isinstance(e, StaleElementReferenceException) and self.page_token is not None:
+                raise  # A remembered element went stale - execute_step looks it up again
+            print(f"⚠️ Popup already gone or error: {e}")
+
+        return True
+
+    def _do_wait_for_ajax(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        loading_selector = selector or ".loading-spinner"
+        max_wait = wait_seconds or 10
+
+        try:
+            self._get_wait(max_wait).until(
+                EC.invisibility_of_element_located(_classify_selector(loading_selector))
+            )
+            print(f"✅ AJAX loading complete")
+            result_logger_gui.info("[Step %s] AJAX complete", step_num)
+        except WebDriverException:
+            print(f"⚠️ No loading indicator found: {loading_selector}")
+
+        self.wait_idle()
+
+        return True
+
+    def _do_unknown(self, step: Dict[str, Any], step_num, selector, value, description, wait_seconds) -> bool:
+        print(f"⚠️ Unknown action: {step.get('action', '')}")
+        result_logger_gui.warning("[Step %s] Unknown action: %s", step_num, step.get("action", ""))
+
+        return True
+
+
+def _dump_steps(steps: List[Dict]) -> bytes:
+    """Steps as indented JSON bytes (orjson when available)"""
+    if orjson:
+        return orjson.dumps(steps, option=orjson.OPT_INDENT_2)
+    return json.dumps(steps, indent=2).encode('utf-8')
+
+
+def _load_steps(path: str) -> List[Dict]:
+    """Read a steps JSON file (orjson when available)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
 
 # ============================================================
 # TEST ORCHESTRATOR (WITH ALL OPTIMIZATIONS)
@@ -1793,6 +2440,12 @@ class TestOrchestrator:
         self.dom_cache = DOMCache()
         self.mode = None
         
+        # Steps files are written on a background thread so the next group starts at once
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._pending_writes = []
+        # ((len(executed_steps), id(group_test_cases)), needs_verification result)
+        self._verification_memo = None
+        
         # AI helper (only if using AI mode)
         if use_ai:
             if not api_key:
@@ -1805,7 +2458,7 @@ class TestOrchestrator:
         self.all_test_cases = self.test_case_repo.get_test_cases()
         
         # Get test groups
-        #self.test_groups = self.site_config.get("test_groups", [])
+        #self.test_groups = self.site_config.test_groups
         self.test_groups = TEST_GROUPS
 
         logger.info(f"[Orchestrator] Initialized for {shopping_site_key}")
@@ -1813,20 +2466,93 @@ class TestOrchestrator:
         print(f"[Orchestrator] Total test cases: {len(self.all_test_cases)}")
         print(f"[Orchestrator] Test groups: {len(self.test_groups)}")
 
+    def _needs_verification(self, executed_steps: List[Dict], group_test_cases: List[Dict]) -> bool:
+        """
+        ContextAnalyzer.needs_verification, memoized on (step count, group)
+        
+        The answer only depends on the group's test cases and the last executed
+        step, so it can't change until another step has been executed.
+        """
+        memo_key = (len(executed_steps), id(group_test_cases))
+        if self._verification_memo and self._verification_memo[0] == memo_key:
+            return self._verification_memo[1]
+        result = ContextAnalyzer.needs_verification(executed_steps, group_test_cases)
+        self._verification_memo = (memo_key, result)
+        return result
+
+    def _split_group(self, test_ids: List[int]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Test cases of a group as (active, skipped), in test-case file order
+        
+        One pass over all_test_cases with a set lookup for the IDs.
+        """
+        wanted = set(test_ids)
+        active, skipped = [], []
+        for tc in self.all_test_cases:
+            if tc['id'] in wanted:
+                (skipped if tc.get('skip', False) else active).append(tc)
+        return active, skipped
+
+    def _get_page_dom(self, url: str, dom_html: str, dom_hash: bytes,
+                      needs_verification: Callable[[], bool]) -> Tuple[str, bool]:
+        """
+        Minimal DOM for the current page: persistent DOMCache first, then the
+        in-memory minimal-DOM caches, extracting only when both miss.
+        
+        Returns:
+            tuple: (minimal_dom, from_dom_cache)
+        """
+        # ✅ OPTIMIZATION 2: Check cache with hash validation
+        cached_data = self.dom_cache.get(url, dom_hash)
+        if cached_data:
+            return cached_data['dom_html'], True
+        
+        # ✅ OPTIMIZATION 1: Get minimal DOM with appropriate level
+        minimal_dom = self.dom_detector.get_or_recompute(
+            self.dom_extractor, needs_verification(), dom_html, dom_hash
+        )
+        
+        # Cache the new DOM with hash
+        self.dom_cache.set(url, minimal_dom, dom_hash)
+        return minimal_dom, False
+    
+    def _load_initial_dom(self) -> Tuple[str, bytes, str, bool]:
+        """
+        Settle the freshly loaded page and get its minimal DOM.
+        
+        Returns:
+            tuple: (current_url, dom_hash, minimal_dom, from_dom_cache)
+        """
+        time.sleep(3)
+        
+        # Observe mutations from here on, so the first step can skip a full re-hash
+        self.dom_detector.last_mutation_count = self.dom_extractor.arm_mutation_counter()
+        
+        # ✅ OPTIMIZATION 2: Check DOM cache by URL + hash validation
+        current_url = self.driver.current_url
+        # Full minimal DOM is extracted in the same round trip in case the cache misses
+        dom_html, current_hash = self.dom_extractor.get_dom_snapshot(prefetch_minimal=True)
+        # (Initial load: we don't know what's needed yet, so include verification)
+        initial_dom, from_cache = self._get_page_dom(current_url, dom_html, current_hash, lambda: True)
+        return current_url, current_hash, initial_dom, from_cache
+    
     def run_with_ai(self):
         """
         Run tests using AI to generate steps dynamically
         ✅ WITH ALL OPTIMIZATIONS ENABLED
+        
+        Groups and their AI calls run strictly one after another: every call
+        needs the DOM the single driver shows at that moment, and later groups
+        log in with the credentials registered by the first one.
         """
-        print("\n" + "="*70)
-        print("🤖 AI-POWERED TEST EXECUTION (OPTIMIZED)")
-        print("="*70)
-        print(f"✅ Optimization 1: Minimal DOM (saves 80-90% tokens)")
-        print(f"✅ Optimization 2: DOM Caching with hash validation")
-        print(f"✅ Optimization 3: Smart Context Detection")
-        print(f"Expected API cost savings: 75-85% total")
-        print(f"Note: Cache validated with hash to ensure reliability")
-        print("="*70)
+        _banner("🤖 AI-POWERED TEST EXECUTION (OPTIMIZED)", (
+            _BIGSEP,
+            "✅ Optimization 1: Minimal DOM (saves 80-90% tokens)",
+            "✅ Optimization 2: DOM Caching with hash validation",
+            "✅ Optimization 3: Smart Context Detection",
+            "Expected API cost savings: 75-85% total",
+            "Note: Cache validated with hash to ensure reliability",
+        ))
 
         self.mode = 'ai'
         
@@ -1837,23 +2563,34 @@ class TestOrchestrator:
         # Clean old DOM cache entries
         self.dom_cache.clear_old_entries(max_age_hours=24)
         
+        try:
+            self._run_groups_with_ai()
+        finally:
+            # Persist cache entries still waiting for the flush interval - also when
+            # a step raised or the run was interrupted
+            self.dom_cache.flush()
+            self.wait_for_pending_writes()
+        
+        _banner("🎉 ALL TEST GROUPS COMPLETE!")
+        
+        result_logger_gui.info(f"\n{_BIGSEP}\nALL TEST GROUPS COMPLETED\n{_BIGSEP}")
+        
+        logger.info("AI-powered test execution complete")
+
+    def _run_groups_with_ai(self):
+        """run_with_ai() body: generate and execute the steps of every test group"""
         # Process each test group
         for group_idx, group in enumerate(self.test_groups, 1):
             group_name = group['name']
             test_ids = group['test_ids']
 
-
-            print(f"\n{'=' * 70}")
-            print(f"📦 GROUP {group_idx}/{len(self.test_groups)}: {group_name.upper()}")
-            print(f"   Test IDs: {test_ids}")
-            print(f"   Description: {group.get('description', '')}")
-            print("=" * 70)
+            _banner(f"📦 GROUP {group_idx}/{len(self.test_groups)}: {group_name.upper()}", (
+                f"   Test IDs: {test_ids}",
+                f"   Description: {group.get('description', '')}",
+            ))
 
             # Select test cases for this group by IDs
-            group_test_cases = [tc for tc in self.all_test_cases if tc['id'] in test_ids]
-
-            skipped_tests = [tc for tc in group_test_cases if tc.get('skip', False)]
-            group_test_cases = [tc for tc in group_test_cases if not tc.get('skip', False)]
+            group_test_cases, skipped_tests = self._split_group(test_ids)
 
             if skipped_tests:
                 print(f"[Phase 1] Skipping {len(skipped_tests)} test(s):")
@@ -1870,41 +2607,37 @@ class TestOrchestrator:
             print(f"[Phase 1] Selected {len(group_test_cases)} test cases for this group")
             
             # Navigate to home page
-            #home_url = self.site_config["url"]
+            #home_url = self.site_config.url
             home_url = self.url
             print(f"[Phase 2] Navigating to {home_url}...")
             self.driver.get(home_url)
-            time.sleep(3)
-            
-            # ✅ OPTIMIZATION 2: Check DOM cache by URL + hash validation
-            current_url = self.driver.current_url
-            current_hash = self.dom_extractor.get_dom_hash()
-            cached_data = self.dom_cache.get(current_url, current_hash)
-            
-            if cached_data:
-                # Use cached DOM (hash validated!)
-                initial_dom = cached_data['dom_html']
-                self.dom_detector.last_dom_hash = current_hash
-                print(f"[Phase 3] Using cached DOM for {current_url} (hash verified)")
-            else:
-                # ✅ OPTIMIZATION 1 & 3: Get minimal DOM with verification elements
-                # (Initial load: we don't know what's needed yet, so include verification)
-                initial_dom = self.dom_extractor.get_minimal_dom(include_verification=True)
-                
-                # Cache the DOM with hash
-                self.dom_cache.set(current_url, initial_dom, current_hash)
-                self.dom_detector.last_dom_hash = current_hash
             
             # Determine if this is the first group (for credential generation)
             is_first = (group_idx == 1)
             
+            # Build the group's fixed prompt prefix (shared by regenerations)
+            group_prefix = self.ai_helper.prepare_group_prefix(
+                group_test_cases,
+                test_context=self.test_context,
+                is_first_group=is_first
+            )
+            
+            current_url, current_hash, initial_dom, from_cache = self._load_initial_dom()
+            self.dom_detector.last_dom_hash = current_hash
+            self.step_executor.forget_elements()
+            if self.dom_detector.last_mutation_count is not None:
+                self.step_executor.page_token = (self.dom_detector.last_mutation_count, current_url)
+            if from_cache:
+                print(f"[Phase 3] Using cached DOM for {current_url} (hash verified)")
+            
             # Generate initial steps using AI
             print(f"[Phase 3] Generating steps for group '{group_name}'...")
             steps = self.ai_helper.generate_test_steps(
                 initial_dom,
                 group_test_cases,
                 test_context=self.test_context,
-                is_first_group=is_first
+                is_first_group=is_first,
+                cached_prefix=group_prefix
             )
             
             if not steps:
@@ -1944,13 +2677,22 @@ class TestOrchestrator:
                 success_count += 1
                 executed_steps.append(step)
                 
-                # Check if DOM changed
-                # Check if DOM changed
-                current_hash = self.dom_extractor.get_dom_hash()
-                dom_changed = self.dom_detector.has_dom_changed(current_hash)
+                # Mutation counter and URL come back together from one script call
+                mutation_count, current_url_now = self.dom_extractor.get_page_state()
+                # Elements found so far stay valid for the next step if neither has moved
+                if mutation_count is not None:
+                    self.step_executor.page_token = (mutation_count, current_url_now)
+
+                # Check if DOM changed - full hash only when the mutation counter moved.
+                # In URL-only mode a DOM change never triggers regeneration, so the
+                # counter alone is enough and the page isn't fetched or hashed here.
+                dom_html = None
+                dom_changed = self.dom_detector.has_dom_mutated(mutation_count)
+                if dom_changed and not self.regenerate_only_on_url_change:
+                    dom_html, current_hash = self.dom_extractor.get_dom_snapshot()
+                    dom_changed = self.dom_detector.has_dom_changed(current_hash)
 
                 # Check if URL changed
-                current_url_now = self.driver.current_url
                 url_changed = current_url_now != getattr(self, '_last_url', current_url)
 
                 # Decide whether to regenerate based on configuration
@@ -1982,31 +2724,19 @@ class TestOrchestrator:
                     # Store current URL for next comparison
                     self._last_url = current_url_now
 
-                    # Get current URL and hash for caching
-                    current_url = self.driver.current_url
+                    # URL was already read with the mutation count - no extra round trip
+                    current_url = current_url_now
+                    if dom_html is None:
+                        dom_html, current_hash = self.dom_extractor.get_dom_snapshot()
+                        self.dom_detector.last_dom_hash = current_hash
                     
-                    # ✅ OPTIMIZATION 2: Check cache with hash validation
-                    cached_data = self.dom_cache.get(current_url, current_hash)
-                    
-                    if cached_data:
-                        # Cache hit with matching hash
-                        new_dom = cached_data['dom_html']
+                    # ✅ OPTIMIZATION 3: Smart context detection (only consulted on a cache miss)
+                    new_dom, from_cache = self._get_page_dom(
+                        current_url, dom_html, current_hash,
+                        lambda: self._needs_verification(executed_steps, group_test_cases)
+                    )
+                    if from_cache:
                         print(f"[DOMCache] ✅ Using cached DOM for regeneration (hash verified)")
-                    else:
-                        # Cache miss or hash mismatch → Get fresh DOM
-                        # ✅ OPTIMIZATION 3: Smart context detection
-                        needs_verification = ContextAnalyzer.needs_verification(
-                            executed_steps,
-                            group_test_cases
-                        )
-                        
-                        # ✅ OPTIMIZATION 1: Get minimal DOM with appropriate level
-                        new_dom = self.dom_extractor.get_minimal_dom(
-                            include_verification=needs_verification
-                        )
-                        
-                        # Cache the new DOM with hash
-                        self.dom_cache.set(current_url, new_dom, current_hash)
                     
                     print(f"Regenerating remaining steps...")
                     
@@ -2017,12 +2747,13 @@ class TestOrchestrator:
                         previous_steps=executed_steps,
                         step_where_dom_changed=current_step_index,
                         test_context=self.test_context,
-                        is_first_group=is_first
+                        is_first_group=is_first,
+                        cached_prefix=group_prefix
                     )
 
                     if remaining_steps:
-                        # Replace remaining steps
-                        steps = executed_steps + remaining_steps
+                        # Replace remaining steps in place - the executed prefix is left as is
+                        steps[current_step_index + 1:] = remaining_steps
                         print(f"✅ Generated {len(remaining_steps)} new steps")
                         logger.info(f"✓ Generated {len(remaining_steps)} new steps - continuing...")
                         logger.info("=" * 70)
@@ -2045,30 +2776,21 @@ class TestOrchestrator:
                 self._save_steps_to_json(executed_steps, output_file)
                 print(f"💾 Saved {len(executed_steps)} steps to {output_file}")
             
-            print(f"{'='*70}")
-            print(f"✅ GROUP '{group_name}' COMPLETE")
-            print(f"   Successful steps: {success_count}/{len(executed_steps)}")
-            print(f"{'='*70}")
+            _banner(f"✅ GROUP '{group_name}' COMPLETE", (
+                f"   Successful steps: {success_count}/{len(executed_steps)}",
+            ))
             
-            result_logger_gui.info("="*70)
-            result_logger_gui.info(f"COMPLETED TEST GROUP: {group_name.upper()}")
-            result_logger_gui.info(f"Successful Steps: {success_count}/{len(executed_steps)}")
-            result_logger_gui.info("="*70)
+            result_logger_gui.info("\n".join((
+                _BIGSEP,
+                f"COMPLETED TEST GROUP: {group_name.upper()}",
+                f"Successful Steps: {success_count}/{len(executed_steps)}",
+                _BIGSEP,
+            )))
             
             logger.info(f"Group '{group_name}' complete - {success_count}/{len(executed_steps)} steps successful")
             
-            # Pause between groups
-            time.sleep(2)
-        
-        print("\n" + "="*70)
-        print("🎉 ALL TEST GROUPS COMPLETE!")
-        print("="*70)
-        
-        result_logger_gui.info("\n" + "="*70)
-        result_logger_gui.info("ALL TEST GROUPS COMPLETED")
-        result_logger_gui.info("="*70)
-        
-        logger.info("AI-powered test execution complete")
+            # Pause between groups - only until the page is idle (2s at most)
+            self.step_executor.wait_idle(timeout=2)
 
     def _run_exploratory_testing(self, exploratory_test_case: Dict) -> list:
         """
@@ -2090,7 +2812,7 @@ class TestOrchestrator:
             current_url = self.driver.current_url
             print(f"📍 Analyzing: {current_url}")
 
-            dom_html = self.dom_extractor.get_minimal_dom(include_verification=True)
+            dom_html = self.dom_detector.get_or_recompute(self.dom_extractor, include_verification=True)
 
             already_tested = [tc['name'] for tc in self.all_test_cases if tc.get('id') != 100]
 
@@ -2174,9 +2896,7 @@ class TestOrchestrator:
             # Look for saved steps file
             # Look for saved steps in project directory
 
-            group_test_cases = [tc for tc in self.all_test_cases if tc['id'] in test_ids]
-            skipped_tests = [tc for tc in group_test_cases if tc.get('skip', False)]
-            active_tests = [tc for tc in group_test_cases if not tc.get('skip', False)]
+            active_tests, skipped_tests = self._split_group(test_ids)
 
             if skipped_tests and active_tests:
                 print(f"\n[Replay] Skipping {len(skipped_tests)} test(s) in group '{group_name}':")
@@ -2210,8 +2930,7 @@ class TestOrchestrator:
             
             # Load steps from file
             try:
-                with open(steps_file, 'r') as f:
-                    steps = json.load(f)
+                steps = _load_steps(steps_file)
                 print(f"[Replay] Loaded {len(steps)} steps from {steps_file}")
                 logger.info(f"Loaded {len(steps)} steps from {steps_file}")
 
@@ -2230,7 +2949,7 @@ class TestOrchestrator:
                 continue
             
             # Navigate to home page
-            #home_url = self.site_config["url"]
+            #home_url = self.site_config.url
             home_url = self.url
             print(f"[Replay] Navigating to {home_url}...")
             logger.info(f"Navigating to home page: {home_url}")
@@ -2470,8 +3189,7 @@ class TestOrchestrator:
         """Update a specific step in the JSON file"""
         try:
             # Load all steps
-            with open(steps_file, 'r') as f:
-                all_steps = json.load(f)
+            all_steps = _load_steps(steps_file)
 
             # Find and update the specific step
             step_number = updated_step.get('step_number')
@@ -2481,8 +3199,8 @@ class TestOrchestrator:
                     break
 
             # Save back to file
-            with open(steps_file, 'w') as f:
-                json.dump(all_steps, f, indent=2)
+            with open(steps_file, 'wb') as f:
+                f.write(_dump_steps(all_steps))
 
             print(f"   💾 Updated JSON file: {steps_file}")
             logger.info(f"Updated step {step_number} in {steps_file}")
@@ -2495,19 +3213,71 @@ class TestOrchestrator:
 
 
     def _save_steps_to_json(self, steps: List[Dict], filename: str):
-        """Save executed steps to JSON file"""
+        """Save executed steps to JSON file (serialized now, written in the background)"""
         try:
-            with open(filename, 'w') as f:
-                json.dump(steps, f, indent=2)
+            payload = _dump_steps(steps)
+        except Exception as e:
+            print(f"❌ Error saving steps: {e}")
+            result_logger_gui.error(f"[Orchestrator] Error saving steps: {e}")
+            return
+        self._pending_writes.append(self._io_pool.submit(self._write_steps_file, payload, filename))
+    
+    @staticmethod
+    def _write_steps_file(payload: bytes, filename: str):
+        try:
+            with open(filename, 'wb') as f:
+                f.write(payload)
             logger.info(f"[Orchestrator] Saved steps to {filename}")
         except Exception as e:
             print(f"❌ Error saving steps: {e}")
             result_logger_gui.error(f"[Orchestrator] Error saving steps: {e}")
+    
+    def wait_for_pending_writes(self):
+        """Block until all background steps-file writes have finished"""
+        for future in self._pending_writes:
+            future.result()
+        self._pending_writes.clear()
+
+    def close(self):
+        """Finish pending steps-file writes and stop the writer thread"""
+        self._io_pool.shutdown(wait=True)
+        self._pending_writes.clear()
 
 
 # ============================================================
 # WEBDRIVER INITIALIZATION
 # ============================================================
+# Chrome command-line switches per mode, plus those used in both
+_HEADLESS_ARGS = (
+    '--headless=new',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--window-size=1920,1080',
+)
+_NORMAL_ARGS = ("--window-size=1400,900",)
+_COMMON_ARGS = (
+    '--disable-save-password-bubble',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-infobars',
+    '--disable-notifications',
+    "--disable-features=PasswordManager",
+)
+
+# Chrome experimental options: no automation banner, password or notification prompts
+_EXPERIMENTAL_OPTIONS = (
+    ('excludeSwitches', ['enable-automation']),
+    ('prefs', {
+        'credentials_enable_service': False,
+        'profile.password_manager_enabled': False,
+        'profile.default_content_setting_values.notifications': 2,
+        "profile.default_content_settings.popups": 0,
+        "autofill.profile_enabled": False
+    }),
+    ('useAutomationExtension', False),
+)
+
+
 def initialize_driver(headless: bool = False) -> WebDriver:
     """Initialize Chrome WebDriver with options"""
     from webdriver_manager.chrome import ChromeDriverManager
@@ -2516,33 +3286,15 @@ def initialize_driver(headless: bool = False) -> WebDriver:
     
     if headless:
         print("[WebDriver] Initializing in HEADLESS mode")
-        options.add_argument('--headless=new')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--window-size=1920,1080')
-
-
+        mode_args = _HEADLESS_ARGS
     else:
         print("[WebDriver] Initializing in NORMAL mode")
-        options.add_argument("--window-size=1400,900")
-    
-    # Common options
-    options.add_argument('--disable-save-password-bubble')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('--disable-infobars')
-    options.add_argument('--disable-notifications')
-    options.add_experimental_option('excludeSwitches', ['enable-automation'])
-    options.add_experimental_option('prefs', {
-        'credentials_enable_service': False,
-        'profile.password_manager_enabled': False,
-        'profile.default_content_setting_values.notifications': 2,
-        "profile.default_content_settings.popups": 0,
-        "autofill.profile_enabled": False
-    })
-
-    options.add_argument("--disable-features=PasswordManager")
-    options.add_experimental_option('useAutomationExtension', False)
+        mode_args = _NORMAL_ARGS
+    
+    for arg in mode_args + _COMMON_ARGS:
+        options.add_argument(arg)
+    for name, value in _EXPERIMENTAL_OPTIONS:
+        options.add_experimental_option(name, value)
     
     try:
         service = Service()
@@ -2563,9 +3315,84 @@ def initialize_driver(headless: bool = False) -> WebDriver:
 # ============================================================
 # MAIN EXECUTION
 # ============================================================
+class Mode(IntEnum):
+    """Run mode: generate steps with AI, or replay saved steps"""
+    AI = 0
+    REPLAY = 1
+
+    @classmethod
+    def parse(cls, value) -> "Mode":
+        """Mode from a Mode or its name ("ai" / "replay", any case) - KeyError if unknown"""
+        return value if isinstance(value, cls) else cls[str(value).upper()]
+
+
+# Idle browsers kept open between run() calls in this process, keyed by headless flag.
+# A run takes its browser out of the pool and puts it back when done, so two
+# concurrent runs never drive the same browser.
+_DRIVER_POOL: Dict[bool, WebDriver] = {}
+
+
+def _quit_pooled_drivers():
+    """Close every pooled browser (at interpreter exit)"""
+    for driver in _DRIVER_POOL.values():
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    _DRIVER_POOL.clear()
+
+
+atexit.register(_quit_pooled_drivers)
+
+
+def _reset_pooled_driver(driver: WebDriver, *urls: str):
+    """
+    Clear a pooled browser's session state before the next run():
+    all cookies, plus storage (localStorage, sessionStorage, IndexedDB,
+    cache) of every origin in urls, then park it on about:blank.
+    
+    Storage of other origins the run visited (e.g. a third-party login or
+    payment page) is not cleared - pass those URLs too if a site uses them.
+    """
+    origins = set()
+    for url in urls:
+        parts = urlsplit(url or "")
+        if parts.scheme in ("http", "https") and parts.netloc:
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    for origin in origins:
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+    driver.get("about:blank")
+
+
+def _get_pooled_driver(headless: bool) -> WebDriver:
+    """
+    Check out a browser for run(): the pooled one while its session is alive,
+    else a new one. Hand it back with _return_pooled_driver().
+    """
+    driver = _DRIVER_POOL.pop(headless, None)
+    if driver is not None:
+        try:
+            driver.current_window_handle
+            return driver
+        except WebDriverException:
+            logger.info("Pooled browser is gone, starting a new one")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    return initialize_driver(headless=headless)
+
+
+def _return_pooled_driver(headless: bool, driver: WebDriver):
+    """Put a reset browser back in the pool - or quit it if another run already returned one"""
+    if _DRIVER_POOL.setdefault(headless, driver) is not driver:
+        driver.quit()
+
+
 def run(
     shopping_site_key: str,
-    mode: str = "ai",
+    mode: Mode = Mode.AI,
     url: str = "url",
     headless: bool = False,
     api_key: Optional[str] = None,
@@ -2574,21 +3401,33 @@ def run(
     """
     Main entry point for test automation
     
+    All test groups run in one browser: they share its session and log in
+    with the credentials the first group registers, so they can't be sharded
+    across parallel browsers. Parallel runs would also overwrite each other's
+    dom_cache.json, and runs of the same site its steps files.
+    
     Args:
         shopping_site_key: Key from SHOPPING_SITES dict
-        mode: "ai" for AI-powered generation, "replay" for JSON replay
+        mode: Mode.AI for AI-powered generation, Mode.REPLAY for JSON replay
+            (the names "ai" / "replay" are accepted too)
         url
         headless: Run browser in headless mode
         api_key: Anthropic API key (required for AI mode)
         regenerate_only_on_url_change
     """
     
-    result_logger_gui.info("="*70)
-    result_logger_gui.info("INITIALIZING TEST AUTOMATION")
-    result_logger_gui.info("="*70)
+    _log_banner("INITIALIZING TEST AUTOMATION", result_logger_gui)
     
     logger.info("Starting test automation (regular no AI run)")
 
+    # Validate the mode once, before a browser is started
+    try:
+        mode = Mode.parse(mode)
+    except KeyError:
+        result_logger_gui.info(f"✗ Invalid mode: {mode}")
+        logger.error(f"Invalid mode specified: {mode}. Use 'ai' or 'replay'")
+        return
+
     # Validate shopping site key
     #if shopping_site_key not in SHOPPING_SITES:
     #    print(f"❌ ERROR: Shopping site '{shopping_site_key}' not found in SHOPPING_SITES config")
@@ -2600,93 +3439,106 @@ def run(
     #site_config = SHOPPING_SITES[shopping_site_key]
     target_url = url
     
-    print("\n" + "="*70)
-    print("🛒 SHOPPING SITE TEST AUTOMATION (OPTIMIZED)")
-    print("="*70)
-    print(f"Shopping Site: {shopping_site_key}")
-    print(f"Target URL: {target_url}")
-    print(f"Mode: {mode.upper()}")
-    print(f"Headless: {headless}")
-    if mode == "ai":
-        print(f"✅ Cost Optimizations: Minimal DOM + Caching + Smart Context")
-        print(f"✅ Expected Savings: 85%+ on API costs")
-    print("="*70)
-    
-    result_logger_gui.info(f"Shopping Site: {shopping_site_key}")
-    result_logger_gui.info(f"Target URL: {target_url}")
-    result_logger_gui.info(f"Mode: {mode.upper()}")
-    result_logger_gui.info(f"Headless: {headless}")
-    result_logger_gui.info(f"regenerate_only_on_url_change: {regenerate_only_on_url_change}")
-
-    logger.info(f"Configuration - Site: {shopping_site_key}, Mode: {mode}, Headless: {headless}")
-    
-    if mode == "ai":
-        result_logger_gui.info("✓ Cost Optimizations Enabled:")
-        result_logger_gui.info("  - Minimal DOM extraction")
-        result_logger_gui.info("  - DOM caching by URL")
-        result_logger_gui.info("  - Smart context detection")
+    # Console banners only for an interactive, visible run - the loggers still get everything
+    verbose = not headless and sys.stdout.isatty()
+    
+    if verbose:
+        banner_lines = [
+            _BIGSEP,
+            f"Shopping Site: {shopping_site_key}",
+            f"Target URL: {target_url}",
+            f"Mode: {mode.name}",
+            f"Headless: {headless}",
+        ]
+        if mode is Mode.AI:
+            banner_lines += [
+                "✅ Cost Optimizations: Minimal DOM + Caching + Smart Context",
+                "✅ Expected Savings: 85%+ on API costs",
+            ]
+        _banner("🛒 SHOPPING SITE TEST AUTOMATION (OPTIMIZED)", tuple(banner_lines))
+    
+    # One multi-line record per block instead of a handler dispatch per line
+    gui_lines = [
+        f"Shopping Site: {shopping_site_key}",
+        f"Target URL: {target_url}",
+        f"Mode: {mode.name}",
+        f"Headless: {headless}",
+        f"regenerate_only_on_url_change: {regenerate_only_on_url_change}",
+    ]
+    if mode is Mode.AI:
+        gui_lines += [
+            "✓ Cost Optimizations Enabled:",
+            "  - Minimal DOM extraction",
+            "  - DOM caching by URL",
+            "  - Smart context detection",
+        ]
+    result_logger_gui.info("\n".join(gui_lines))
+
+    logger.info(f"Configuration - Site: {shopping_site_key}, Mode: {mode.name.lower()}, Headless: {headless}")
+    if mode is Mode.AI:
         logger.info("AI mode enabled with cost optimizations")
     
     driver = None
+    orchestrator = None
     
     try:
         # Initialize WebDriver
-        logger.info("\nInitializing browser...")
-        logger.info("="*70)
+        logger.info("\nInitializing browser...\n%s", _BIGSEP)
         
-        driver = initialize_driver(headless=headless)
+        driver = _get_pooled_driver(headless)
         
-        result_logger_gui.info("✓ Browser initialized successfully")
+        result_logger_gui.info(f"✓ Browser initialized successfully\nPreparing test environment...\n{_BIGSEP}")
         
         # Create orchestrator
-        result_logger_gui.info("Preparing test environment...")
-        result_logger_gui.info("="*70)
-        
         logger.info("Creating test orchestrator")
         orchestrator = TestOrchestrator(
             driver=driver,
             shopping_site_key=shopping_site_key,
             url=url,
             api_key=api_key,
-            use_ai=(mode == "ai"),
+            use_ai=(mode is Mode.AI),
             regenerate_only_on_url_change=regenerate_only_on_url_change
         )
         
         logger.info(f"✓ Loaded {len(orchestrator.all_test_cases)} test cases")
         
         # Run based on mode
-        if mode == "ai":
+        if mode is Mode.AI:
             orchestrator.run_with_ai()
-        elif mode == "replay":
-            orchestrator.run_from_json()
         else:
-            print(f"❌ Invalid mode: {mode}. Use 'ai' or 'replay'")
-            result_logger_gui.info(f"✗ Invalid mode: {mode}")
-            logger.error(f"Invalid mode specified: {mode}")
+            orchestrator.run_from_json()
         
     except KeyboardInterrupt:
-        print("\n⌨️ User interrupted execution (Ctrl+C)")
         result_logger_gui.info("\n\n✗ Test execution interrupted by user")
         logger.info("User interrupted execution (Ctrl+C)")
     except Exception as e:
-        print(f"❌ Error during execution: {e}")
-        result_logger_gui.info(f"✗ Error during execution: {str(e)}")
-        logger.error(f"Error during execution: {e}")
-        import traceback
-        traceback.print_exc()
-        logger.error(traceback.format_exc())
+        # Traceback formatted once and sent to every logger handler (console included)
+        logger.exception("Error during execution: %s", e)
+        result_logger_gui.error("✗ Error during execution: %s", e)
     finally:
+        if orchestrator:
+            orchestrator.close()
         if driver:
-            driver.quit()
-            print("\n[Main] Browser closed")
-            result_logger_gui.info("\n✓ Browser closed")
-            logger.info("Browser closed")
+            # Keep the browser for the next run() - only clear this run's session
+            try:
+                _reset_pooled_driver(driver, url, driver.current_url)
+                _return_pooled_driver(headless, driver)
+                result_logger_gui.info("\n✓ Browser reset for the next run")
+                logger.info("Browser reset for reuse")
+            except WebDriverException:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                result_logger_gui.info("\n✓ Browser closed")
+                logger.info("Browser closed")
 
 
 # ============================================================
 # CONFIGURATION & ENTRY POINT
 # ============================================================
 if __name__ == "__main__":
+    import argparse
     
     # ============================================================
     # CONFIGURATION
@@ -2697,9 +3549,14 @@ if __name__ == "__main__":
 
     URL = "https://automationexercise.com/"
     
-    # Mode: "ai" = generate with AI, "replay" = use saved JSON
+    # Mode: "ai" = generate with AI, "replay" = use saved JSON (default, --mode overrides)
     #MODE = "ai"
     MODE = "ai"
+    
+    parser = argparse.ArgumentParser(description="Shopping site test automation")
+    parser.add_argument("--mode", choices=[m.name.lower() for m in Mode], default=MODE,
+                        help=f"ai = generate steps with AI, replay = use saved JSON (default: {MODE})")
+    MODE = Mode.parse(parser.parse_args().mode)
 
     # Browser settings
     HEADLESS = False
@@ -2710,37 +3567,37 @@ if __name__ == "__main__":
     REGENERATE_ONLY_ON_URL_CHANGE = True  # Default: check DOM changes
     
     # Validate configuration
-    if not API_KEY and MODE == "ai":
-        print("="*70)
-        print("❌ ERROR: ANTHROPIC_API_KEY not found in environment")
-        print("Please set the API key or switch to 'replay' mode")
-        print("="*70)
+    if not API_KEY and MODE is Mode.AI:
+        _banner("❌ ERROR: ANTHROPIC_API_KEY not found in environment",
+                ("Please set the API key or switch to 'replay' mode",))
         sys.exit(1)
     
     if SHOPPING_SITE not in SHOPPING_SITES:
-        print("="*70)
-        print(f"❌ ERROR: Shopping site '{SHOPPING_SITE}' not found in SHOPPING_SITES")
-        print(f"Available sites: {', '.join(SHOPPING_SITES.keys())}")
-        print("="*70)
+        _banner(f"❌ ERROR: Shopping site '{SHOPPING_SITE}' not found in SHOPPING_SITES",
+                (f"Available sites: {', '.join(SHOPPING_SITES.keys())}",))
         sys.exit(1)
     
-    # Display configuration
+    # Display configuration (interactive, visible runs only)
     #site_config = SHOPPING_SITES[SHOPPING_SITE]
-    print("\n" + "="*70)
-    print("📋 CONFIGURATION")
-    print("="*70)
-    print(f"Shopping Site: {SHOPPING_SITE}")
-    print(f"Target URL: {URL}")
-    print(f"Test Cases File: {GENERIC_TEST_CASES_FILE}")
-    print(f"DOM Cache: {DOM_CACHE_FILE}")
-    print(f"Mode: {MODE}")
-    print(f"Headless: {HEADLESS}")
-    if MODE == "ai":
-        print(f"✅ OPTIMIZATIONS ENABLED:")
-        print(f"   - Minimal DOM extraction")
-        print(f"   - DOM caching by URL")
-        print(f"   - Smart context detection")
-    print("="*70)
+    VERBOSE = HEADLESS is False and sys.stdout.isatty()
+    config_lines = [
+        _BIGSEP,
+        f"Shopping Site: {SHOPPING_SITE}",
+        f"Target URL: {URL}",
+        f"Test Cases File: {GENERIC_TEST_CASES_FILE}",
+        f"DOM Cache: {DOM_CACHE_FILE}",
+        f"Mode: {MODE.name.lower()}",
+        f"Headless: {HEADLESS}",
+    ]
+    if MODE is Mode.AI:
+        config_lines += [
+            "✅ OPTIMIZATIONS ENABLED:",
+            "   - Minimal DOM extraction",
+            "   - DOM caching by URL",
+            "   - Smart context detection",
+        ]
+    if VERBOSE:
+        _banner("📋 CONFIGURATION", tuple(config_lines))
     
     # ============================================================
     # RUN THE AUTOMATION
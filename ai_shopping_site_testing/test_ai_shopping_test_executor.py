@@ -0,0 +1,188 @@
+"""
+Tests for the pure helpers in ai_shopping_test_executor (no browser needed,
+except for the live extraction comparison, which is skipped without Chrome)
+
+Run: python -m pytest ai_shopping_site_testing/test_ai_shopping_test_executor.py
+"""
+
+import os
+import shutil
+import sys
+from urllib.parse import quote
+
+import pytest
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ai_shopping_test_executor as executor
+
+
+# ============================================================
+# CLICK-STEP KEYWORDS
+# ============================================================
+# Click descriptions from the saved *_steps.json files: none of them may change
+# the classification they had under the old substring match
+@pytest.mark.parametrize("description, is_submit", [
+    ("Click 'Create Account' button", True),
+    ("Click 'Signup' button", True),
+    ("Click Signup/Login link in navigation", True),
+    ("Click on 'Signup / Login' button", True),
+    ("Click signup button to submit", True),
+    ("Click arrow button to subscribe", False),
+    ("Click on 'Cart' button", False),
+    ("Click on 'Contact Us' button", False),
+    ("Click on Products link in header", False),
+    ("Select checkbox 'Sign up for our newsletter!'", False),
+    ("Select checkbox 'Receive special offers from our partners!'", False),
+    ("Select title 'Mr.'", False),
+])
+def test_saved_click_steps_keep_their_submit_classification(description, is_submit):
+    assert executor._is_submit_click(description) is is_submit
+
+
+@pytest.mark.parametrize("description", [
+    "Click submitButton",
+    "Click the SignUp link",
+    "Click loginBtn",
+    "Submitted the registration form",
+    "Click 'Submitting...' button",
+    "Click Registered users login",
+])
+def test_inflected_and_camel_case_submit_words_match(description):
+    assert executor._is_submit_click(description)
+
+
+@pytest.mark.parametrize("description", [
+    "Click 'Submission guidelines' link",
+    "Click the 'Sign in' tab",
+    "Click product badge",
+])
+def test_non_submit_clicks_stay_unmatched(description):
+    assert not executor._is_submit_click(description)
+
+
+# Test case names from generic_shopping_test_cases.json
+@pytest.mark.parametrize("test_case, is_negative", [
+    ("Register New User", False),
+    ("Login User with Correct Credentials", False),
+    ("Login User with Incorrect Credentials", True),
+    ("Logout User", False),
+    ("Register User with Existing Email", True),
+    ("Submit Contact Us Form", False),
+    ("Place Order - Login Before Checkout", False),
+    ("Search Products and Verify Cart After Login", False),
+])
+def test_generic_test_cases_keep_their_negative_classification(test_case, is_negative):
+    assert executor._is_negative_test("Click 'Login' button", test_case) is is_negative
+
+
+@pytest.mark.parametrize("description", [
+    "Click login - expect Sign-in failure",
+    "Click submit with incorrectly formatted email",
+    "Click login after a failed attempt",
+    "Click register with an email that already exists",
+    "Click login with a nonexistent user",
+    "Submit wrongly typed password",
+])
+def test_inflected_negative_words_match(description):
+    assert executor._is_negative_test(description, "")
+
+
+def test_negative_words_do_not_match_inside_other_words():
+    assert not executor._is_negative_test("Click the product badge", "View Products by Category")
+
+
+# ============================================================
+# MINIMAL DOM: PYTHON FALLBACK VS BROWSER EXTRACTION
+# ============================================================
+# Page source as XMLSerializer writes it: head script, comment, nbsp, extra
+# whitespace, an emoji, a nested script and <template> content
+PAGE_SOURCE = (
+    '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Shop</title>'
+    '<script id="cfg">if (a &lt; b) { go(); }</script></head><body class="page">\n'
+    '<nav id="menu"><a href="/">Home</a> <a href="/cart" class="cart-link">Cart  (2)</a></nav>\n'
+    '<article class="product"><h2>Blue   Shirt</h2><span class="price">$19.99</span>'
+    '<!-- promo --><button class="btn add" data-qa="add">Add\u00a0to cart</button></article>\n'
+    '<aside><button>Buy</button></aside>\n'
+    '<form id="login"><input type="email" name="email" />'
+    '<input type="password" name="pw" disabled="" /><button type="submit">Log in</button></form>\n'
+    '<div id="app">Welcome \U0001F600<script>var x = 1 &amp;&amp; 2 &lt; 3;</script></div>\n'
+    '<template><a id="tpl">Hidden</a></template>\n'
+    '<img alt="logo" src="/l.png" />\n'
+    '</body></html>'
+)
+
+# What _MINIMAL_DOM_JS returns for that page, in document order
+_NAV = ('nav', {'id': 'menu'}, 'Home Cart (2)')
+_ACTION_TRIPLES = [
+    _NAV,
+    ('a', {'href': '/'}, 'Home'),
+    ('a', {'href': '/cart', 'class': 'cart-link'}, 'Cart (2)'),
+    ('button', {'class': 'btn add', 'data-qa': 'add'}, 'Add to cart'),
+    ('button', {}, 'Buy'),
+    ('form', {'id': 'login'}, 'Log in'),
+    ('input', {'type': 'email', 'name': 'email'}, ''),
+    ('input', {'type': 'password', 'name': 'pw'}, ''),
+    ('button', {'type': 'submit'}, 'Log in'),
+    ('div', {'id': 'app'}, 'Welcome \U0001F600var x = 1 && 2 < 3;'),
+]
+_FULL_TRIPLES = (
+    [('script', {'id': 'cfg'}, 'if (a < b) { go(); }')]
+    + _ACTION_TRIPLES[:3]
+    + [('article', {'class': 'product'}, 'Blue Shirt$19.99Add to cart'),
+       ('h2', {}, 'Blue Shirt'),
+       ('span', {'class': 'price'}, '$19.99')]
+    + _ACTION_TRIPLES[3:]
+    + [('img', {}, '')]
+)
+
+PARSERS = [
+    pytest.param(False, id="beautifulsoup"),
+    pytest.param(True, id="lexbor", marks=pytest.mark.skipif(
+        executor.LexborHTMLParser is None, reason="selectolax not installed")),
+]
+
+
+@pytest.mark.parametrize("use_lexbor", PARSERS)
+@pytest.mark.parametrize("include_verification, triples", [
+    (True, _FULL_TRIPLES),
+    (False, _ACTION_TRIPLES),
+])
+def test_minimal_from_html_matches_browser_extraction(monkeypatch, use_lexbor,
+                                                      include_verification, triples):
+    if not use_lexbor:
+        monkeypatch.setattr(executor, "LexborHTMLParser", None)
+    expected = executor._format_minimal(triples)
+    assert executor._minimal_from_html(PAGE_SOURCE, include_verification) == expected
+
+
+@pytest.mark.parametrize("use_lexbor", PARSERS)
+def test_minimal_from_html_cuts_text_at_200_code_points(monkeypatch, use_lexbor):
+    if not use_lexbor:
+        monkeypatch.setattr(executor, "LexborHTMLParser", None)
+    text = "\U0001F600 " * 150
+    page = '<html><body><div id="long">' + text + '</div></body></html>'
+    expected = executor._format_minimal([('div', {'id': 'long'}, text[:200])])
+    assert executor._minimal_from_html(page, False) == expected
+
+
+@pytest.fixture(scope="module")
+def chrome():
+    if not any(shutil.which(name) for name in ("google-chrome", "chromium", "chromium-browser")):
+        pytest.skip("Chrome not installed")
+    try:
+        driver = executor.initialize_driver(headless=True)
+    except Exception as e:
+        pytest.skip(f"Chrome could not be started: {e}")
+    yield driver
+    driver.quit()
+
+
+@pytest.mark.parametrize("include_verification", [True, False])
+def test_browser_and_python_extraction_agree(chrome, include_verification):
+    chrome.get("data:text/html;charset=utf-8," + quote(PAGE_SOURCE))
+    extractor = executor.DOMExtractor(chrome)
+    dom_html, digest = extractor.get_dom_snapshot(prefetch_minimal=include_verification)
+    browser_minimal = extractor._minimal_cache[(digest, include_verification)]
+    assert executor._minimal_from_html(dom_html, include_verification) == browser_minimal
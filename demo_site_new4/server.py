@@ -6,18 +6,51 @@ Then open: http://localhost:8000/test-form.html
 """
 
 import http.server
-import socketserver
 import os
 
+# Optional: aiohttp serves files with sendfile() and handles requests concurrently
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
 PORT = 8000
 
+# Sent with every response
+EXTRA_HEADERS = {
+    # Allow iframes
+    'X-Frame-Options': 'SAMEORIGIN',
+    'Access-Control-Allow-Origin': '*',
+}
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep connections open so the page's assets and iframes reuse them
+    protocol_version = "HTTP/1.1"
+
     def end_headers(self):
-        # Allow iframes
-        self.send_header('X-Frame-Options', 'SAMEORIGIN')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in EXTRA_HEADERS.items():
+            self.send_header(name, value)
+        if not self.close_connection:
+            self.send_header('Connection', 'keep-alive')
         super().end_headers()
 
+
+def create_app():
+    """aiohttp app serving the current directory, like SimpleHTTPRequestHandler"""
+    @web.middleware
+    async def extra_headers(request, handler):
+        response = await handler(request)
+        response.headers.update(EXTRA_HEADERS)
+        return response
+
+    async def index(request):
+        return web.FileResponse('index.html')
+
+    app = web.Application(middlewares=[extra_headers])
+    app.router.add_get('/', index)
+    app.router.add_static('/', '.', follow_symlinks=False)
+    return app
+
 if __name__ == "__main__":
     Handler = MyHTTPRequestHandler
     
@@ -38,8 +71,14 @@ if __name__ == "__main__":
     print("\n⌨️  Press Ctrl+C to stop server\n")
     print("=" * 60)
     
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            print("\n\n👋 Server stopped.")
+    if web:
+        # FileResponse uses sendfile(); aiohttp sets TCP_NODELAY on its connections
+        web.run_app(create_app(), port=PORT, access_log=None, print=None)
+        print("\n\n👋 Server stopped.")
+    else:
+        with http.server.ThreadingHTTPServer(("", PORT), Handler) as httpd:
+            httpd.daemon_threads = True
+            try:
+                httpd.serve_forever()
+            except KeyboardInterrupt:
+                print("\n\n👋 Server stopped.")